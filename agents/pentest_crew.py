@@ -4,10 +4,12 @@ from crewai.tools import BaseTool
 from models.ollama_manager import OllamaManager
 from tools import ToolManager
 import asyncio
-from typing import Dict, Any, Optional, List
+import inspect
+from typing import Dict, Any, Optional, List, Callable
 import logging
 from pydantic import Field
 from mongodb_integration import CrewAIMongoDB
+from report_utils import summarize_pentest_results
 import json
 import uuid
 from datetime import datetime
@@ -166,12 +168,13 @@ class TaskPlanner:
         tool_results = self.mongodb.get_tool_results(target=target, limit=20)
         
         for result in tool_results:
-            if result.get("session_id") == self.session_id:
+            result_data = result.get("result_data", {})
+            if result_data.get("session_id") == self.session_id:
                 tool_name = result.get("tool_name", "unknown")
                 current_state["completed_tools"].append(tool_name)
                 
                 # Extract findings and vulnerabilities from tool output
-                output = result.get("result", {}).get("output", "")
+                output = result_data.get("output", "")
                 if "vulnerability" in output.lower() or "exploit" in output.lower():
                     current_state["vulnerabilities"].append({
                         "tool": tool_name,
@@ -353,7 +356,7 @@ class PentestCrew:
         self.ollama_manager = OllamaManager()
         self.tool_manager = ToolManager()
         self.mongodb = CrewAIMongoDB()  # Initialize MongoDB integration
-        self.session_id = str(uuid.uuid4())  # Unique session ID for this instance
+        self.session_id = str(uuid.uuid4())  # Session for the crew's own logs; each pentest gets its own
         self.task_planner = TaskPlanner(self.ollama_manager, self.mongodb, self.session_id)
         self.agents = self._create_agents()
         self.tasks = []
@@ -442,8 +445,13 @@ class PentestCrew:
             'reporting': report_agent
         }
     
-    def execute_tool(self, tool_name: str, target: str, **kwargs) -> str:
-        """Execute a specific penetration testing tool with comprehensive logging"""
+    def new_task_planner(self, session_id: Optional[str] = None) -> TaskPlanner:
+        """TaskPlanner scoped to one pentest session, so its decisions only see that session's results"""
+        return TaskPlanner(self.ollama_manager, self.mongodb, session_id or str(uuid.uuid4()))
+    
+    def execute_tool(self, tool_name: str, target: str, session_id: Optional[str] = None, **kwargs) -> str:
+        """Execute a specific penetration testing tool with comprehensive logging, under session_id (default: the crew's own)"""
+        session_id = session_id or self.session_id
         
         # Log tool execution start
         if self.mongodb.is_connected():
@@ -456,7 +464,7 @@ class PentestCrew:
                     "kwargs": kwargs,
                     "started_at": datetime.utcnow().isoformat()
                 },
-                pentest_session_id=self.session_id
+                pentest_session_id=session_id
             )
         
         try:
@@ -476,7 +484,7 @@ class PentestCrew:
                         "metadata": result.metadata,
                         "completed_at": datetime.utcnow().isoformat()
                     },
-                    pentest_session_id=self.session_id
+                    pentest_session_id=session_id
                 )
                 
                 # Store detailed tool results
@@ -485,7 +493,7 @@ class PentestCrew:
                     "output": result.output,
                     "metadata": result.metadata,
                     "kwargs": kwargs,
-                    "session_id": self.session_id
+                    "session_id": session_id
                 }
                 mongodb_id = self.mongodb.store_tool_result(tool_name, target, tool_result_data)
                 
@@ -497,7 +505,7 @@ class PentestCrew:
                     context={
                         "tool_name": tool_name,
                         "target": target,
-                        "session_id": self.session_id,
+                        "session_id": session_id,
                         "mongodb_result_id": mongodb_id
                     }
                 )
@@ -521,7 +529,7 @@ class PentestCrew:
                         "error": str(e),
                         "failed_at": datetime.utcnow().isoformat()
                     },
-                    pentest_session_id=self.session_id
+                    pentest_session_id=session_id
                 )
                 
                 # Store error command execution
@@ -532,7 +540,7 @@ class PentestCrew:
                     context={
                         "tool_name": tool_name,
                         "target": target,
-                        "session_id": self.session_id,
+                        "session_id": session_id,
                         "error": str(e)
                     }
                 )
@@ -544,7 +552,7 @@ class PentestCrew:
                     "error": str(e),
                     "metadata": {},
                     "kwargs": kwargs,
-                    "session_id": self.session_id
+                    "session_id": session_id
                 }
                 self.mongodb.store_tool_result(tool_name, target, error_data)
             
@@ -554,6 +562,10 @@ class PentestCrew:
         """Get list of available penetration testing tools"""
         return self.tool_manager.get_available_tools()
     
+    async def aclose(self):
+        """Release the crew's Ollama connections; call on shutdown"""
+        await self.ollama_manager.aclose()
+    
     def get_recent_pentest_results(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Get recent penetration test results from MongoDB
@@ -631,6 +643,14 @@ class PentestCrew:
         
         return self.mongodb.get_command_executions(limit=limit)
     
+    # Only the fields _build_session_summary reads, so tool output blobs stay on the server
+    _SUMMARY_FIELDS = {
+        "agent_actions": ["agent_role", "action_type"],
+        "tool_results": ["tool_name", "result_data.session_id", "result_data.success"],
+        "command_executions": ["context.session_id"],
+        "pentest_results": ["session_id"]
+    }
+    
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """
         Get a comprehensive summary of a specific pentest session
@@ -646,29 +666,99 @@ class PentestCrew:
         
         try:
             # Get all data for this session
-            agent_actions = self.mongodb.get_agent_actions(pentest_session_id=session_id, limit=1000)
-            tool_results = self.mongodb.get_tool_results(limit=1000)
-            command_executions = self.mongodb.get_command_executions(limit=1000)
-            pentest_results = self.mongodb.get_pentest_results(limit=10)
+            agent_actions = self.mongodb.get_agent_actions(pentest_session_id=session_id, limit=1000, fields=self._SUMMARY_FIELDS["agent_actions"])
+            tool_results = self.mongodb.get_tool_results(limit=1000, fields=self._SUMMARY_FIELDS["tool_results"])
+            command_executions = self.mongodb.get_command_executions(limit=1000, fields=self._SUMMARY_FIELDS["command_executions"])
+            pentest_results = self.mongodb.get_pentest_results(limit=10, fields=self._SUMMARY_FIELDS["pentest_results"])
             
-            # Filter data for this session
-            session_tools = [t for t in tool_results if t.get('result_data', {}).get('session_id') == session_id]
-            session_commands = [c for c in command_executions if c.get('context', {}).get('session_id') == session_id]
-            session_pentests = [p for p in pentest_results if p.get('session_id') == session_id]
+            return self._build_session_summary(session_id, agent_actions, tool_results, command_executions, pentest_results)
             
-            return {
-                "session_id": session_id,
-                "agent_actions": len(agent_actions),
-                "tool_executions": len(session_tools),
-                "command_executions": len(session_commands),
-                "pentest_results": len(session_pentests),
-                "summary": {
-                    "tools_used": list(set([t.get('tool_name') for t in session_tools])),
-                    "agents_active": list(set([a.get('agent_role') for a in agent_actions])),
-                    "action_types": list(set([a.get('action_type') for a in agent_actions])),
-                    "success_rate": len([t for t in session_tools if t.get('result_data', {}).get('success')]) / max(len(session_tools), 1) * 100
-                }
+        except Exception as e:
+            return {"error": f"Error getting session summary: {e}"}
+    
+    def _build_session_summary(self, session_id: str, agent_actions: List[Dict[str, Any]], tool_results: List[Dict[str, Any]],
+                               command_executions: List[Dict[str, Any]], pentest_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Assemble a session summary from the raw collection documents"""
+        # Filter data for this session
+        session_tools = [t for t in tool_results if t.get('result_data', {}).get('session_id') == session_id]
+        session_commands = [c for c in command_executions if c.get('context', {}).get('session_id') == session_id]
+        session_pentests = [p for p in pentest_results if p.get('session_id') == session_id]
+        
+        return {
+            "session_id": session_id,
+            "agent_actions": len(agent_actions),
+            "tool_executions": len(session_tools),
+            "command_executions": len(session_commands),
+            "pentest_results": len(session_pentests),
+            "summary": {
+                "tools_used": list(set([t.get('tool_name') for t in session_tools])),
+                "agents_active": list(set([a.get('agent_role') for a in agent_actions])),
+                "action_types": list(set([a.get('action_type') for a in agent_actions])),
+                "success_rate": len([t for t in session_tools if t.get('result_data', {}).get('success')]) / max(len(session_tools), 1) * 100
             }
+        }
+    
+    async def get_database_stats_async(self) -> Dict[str, Any]:
+        """Async variant of get_database_stats for the FastAPI event loop"""
+        return await self.mongodb.get_stats_async()
+    
+    async def get_recent_pentest_results_async(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Async variant of get_recent_pentest_results for the FastAPI event loop"""
+        if not self.mongodb.is_connected():
+            logger.warning("MongoDB not connected - cannot retrieve results")
+            return []
+        
+        return await self.mongodb.get_pentest_results_async(limit=limit)
+    
+    async def get_agent_actions_async(self, agent_role: Optional[str] = None, session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Async variant of get_agent_actions for the FastAPI event loop"""
+        if not self.mongodb.is_connected():
+            logger.warning("MongoDB not connected - cannot retrieve agent actions")
+            return []
+        
+        return await self.mongodb.get_agent_actions_async(agent_role=agent_role, pentest_session_id=session_id, limit=limit)
+    
+    async def get_command_executions_async(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Async variant of get_command_executions for the FastAPI event loop"""
+        if not self.mongodb.is_connected():
+            logger.warning("MongoDB not connected - cannot retrieve command executions")
+            return []
+        
+        return await self.mongodb.get_command_executions_async(limit=limit)
+    
+    async def get_recent_session_summaries_async(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Summaries of the most recent sessions, computed in a single aggregation"""
+        if not self.mongodb.is_connected():
+            logger.warning("MongoDB not connected - cannot retrieve recent sessions")
+            return []
+        
+        return await self.mongodb.get_recent_session_summaries_async(limit=limit)
+    
+    async def get_dashboard_async(self, limit: int = 10, action_limit: int = 50, agent_role: Optional[str] = None,
+                                  session_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Recent pentest results and agent actions fetched together in one aggregation"""
+        if not self.mongodb.is_connected():
+            logger.warning("MongoDB not connected - cannot retrieve dashboard")
+            return {"recent_results": [], "agent_actions": []}
+        
+        return await self.mongodb.get_dashboard_async(
+            limit=limit, action_limit=action_limit, agent_role=agent_role, pentest_session_id=session_id
+        )
+    
+    async def get_session_summary_async(self, session_id: str) -> Dict[str, Any]:
+        """Async variant of get_session_summary; the four collection reads run concurrently"""
+        if not self.mongodb.is_connected():
+            return {"error": "MongoDB not connected"}
+        
+        try:
+            agent_actions, tool_results, command_executions, pentest_results = await asyncio.gather(
+                self.mongodb.get_agent_actions_async(pentest_session_id=session_id, limit=1000, fields=self._SUMMARY_FIELDS["agent_actions"]),
+                self.mongodb.get_tool_results_async(limit=1000, fields=self._SUMMARY_FIELDS["tool_results"]),
+                self.mongodb.get_command_executions_async(limit=1000, fields=self._SUMMARY_FIELDS["command_executions"]),
+                self.mongodb.get_pentest_results_async(limit=10, fields=self._SUMMARY_FIELDS["pentest_results"])
+            )
+            
+            return self._build_session_summary(session_id, agent_actions, tool_results, command_executions, pentest_results)
             
         except Exception as e:
             return {"error": f"Error getting session summary: {e}"}
@@ -753,8 +843,17 @@ class PentestCrew:
         
         return [recon_task, vuln_task, exploit_task, report_task]
     
-    async def execute_pentest(self, target: str, scope: str = "basic", additional_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Execute the complete penetration testing workflow with comprehensive logging"""
+    async def execute_pentest(self, target: str, scope: str = "basic", additional_params: Optional[Dict[str, Any]] = None,
+                              on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Execute the complete penetration testing workflow with comprehensive logging
+        
+        Args:
+            target: Target to test
+            scope: Testing scope
+            additional_params: Extra workflow parameters
+            on_progress: Optional callback (sync or async) receiving an event after each phase
+        """
         
         if additional_params is None:
             additional_params = {}
@@ -812,7 +911,7 @@ class PentestCrew:
                     )
             
             # Execute AI-guided penetration testing
-            results = await self.execute_ai_guided_pentest(target, scope, additional_params, pentest_session_id)
+            results = await self.execute_ai_guided_pentest(target, scope, additional_params, pentest_session_id, on_progress)
             
             return results
             
@@ -834,7 +933,8 @@ class PentestCrew:
             
             return {"error": str(e), "session_id": pentest_session_id}
     
-    async def execute_ai_guided_pentest(self, target: str, scope: str, additional_params: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    async def execute_ai_guided_pentest(self, target: str, scope: str, additional_params: Dict[str, Any], session_id: str,
+                                        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
         """Execute penetration testing with AI-guided task planning"""
         
         results = {
@@ -845,6 +945,8 @@ class PentestCrew:
             "summary": {}
         }
         
+        task_planner = self.new_task_planner(session_id)
+        
         # Define the penetration testing phases
         phases = [
             ("reconnaissance", "Reconnaissance Specialist"),
@@ -853,11 +955,11 @@ class PentestCrew:
             ("reporting", "Security Report Analyst")
         ]
         
-        for phase_name, agent_role in phases:
+        for phase_index, (phase_name, agent_role) in enumerate(phases, 1):
             logger.info(f"Starting {phase_name} phase with {agent_role}")
             
             # Let AI decide the next tasks for this phase
-            phase_results = await self.execute_ai_guided_phase(target, agent_role, phase_name, session_id)
+            phase_results = await self.execute_ai_guided_phase(target, agent_role, phase_name, session_id, task_planner)
             results["phases"][phase_name] = phase_results
             
             # Log phase completion
@@ -877,6 +979,18 @@ class PentestCrew:
                     },
                     pentest_session_id=session_id
                 )
+            
+            if on_progress is not None:
+                outcome = on_progress({
+                    "phase": phase_name,
+                    "agent": agent_role,
+                    "phases_completed": phase_index,
+                    "phases_total": len(phases),
+                    "tools_used": phase_results.get("tools_used", []),
+                    "success": phase_results.get("success", False)
+                })
+                if inspect.isawaitable(outcome):
+                    await outcome
         
         # Generate final summary
         results["summary"] = self.generate_pentest_summary(results, session_id)
@@ -885,14 +999,16 @@ class PentestCrew:
         if self.mongodb.is_connected():
             results["target"] = target
             results["session_id"] = session_id
-            mongodb_result_id = self.mongodb.store_pentest_result(results)
+            mongodb_result_id = await self.mongodb.astore_pentest_result(results)
             results["mongodb_id"] = mongodb_result_id
             logger.info(f"Pentest results stored in MongoDB with ID: {mongodb_result_id}")
         
         return results
     
-    async def execute_ai_guided_phase(self, target: str, agent_role: str, phase_name: str, session_id: str) -> Dict[str, Any]:
+    async def execute_ai_guided_phase(self, target: str, agent_role: str, phase_name: str, session_id: str,
+                                      task_planner: Optional[TaskPlanner] = None) -> Dict[str, Any]:
         """Execute a single phase with AI-guided task selection"""
+        task_planner = task_planner or self.new_task_planner(session_id)
         
         phase_results = {
             "phase": phase_name,
@@ -906,15 +1022,15 @@ class PentestCrew:
         max_tasks_per_phase = 5  # Limit tasks per phase to prevent infinite loops
         
         for task_num in range(max_tasks_per_phase):
-            # Get AI decision for next task
-            decision = self.task_planner.decide_next_task(target, agent_role)
+            # Get AI decision for next task; the LLM call and Mongo reads block, so keep them off the loop
+            decision = await asyncio.to_thread(task_planner.decide_next_task, target, agent_role)
             
             # Validate decision structure
             if not isinstance(decision, dict) or "recommended_tool" not in decision:
                 logger.error(f"Invalid decision structure from AI: {decision}")
                 # Create a fallback decision
-                decision = self.task_planner._create_fallback_decision(
-                    self.task_planner.analyze_current_state(target), 
+                decision = task_planner._create_fallback_decision(
+                    await asyncio.to_thread(task_planner.analyze_current_state, target), 
                     agent_role
                 )
             
@@ -975,8 +1091,8 @@ class PentestCrew:
             )
         
         try:
-            # Execute the tool
-            result = self.execute_tool(tool_name, target, **parameters)
+            # Execute the tool in a worker thread; scans can run for minutes
+            result = await asyncio.to_thread(self.execute_tool, tool_name, target, session_id=session_id, **parameters)
             
             # Parse the result
             task_result = {
@@ -1037,44 +1153,4 @@ class PentestCrew:
     
     def generate_pentest_summary(self, results: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Generate a summary of the penetration testing results"""
-        
-        summary = {
-            "total_phases": len(results.get("phases", {})),
-            "total_tools_used": [],
-            "total_findings": 0,
-            "vulnerabilities_found": 0,
-            "success_rate": 0,
-            "recommendations": []
-        }
-        
-        successful_tasks = 0
-        total_tasks = 0
-        
-        for phase_name, phase_data in results.get("phases", {}).items():
-            if isinstance(phase_data, dict):
-                summary["total_tools_used"].extend(phase_data.get("tools_used", []))
-                summary["total_findings"] += len(phase_data.get("findings", []))
-                
-                for task in phase_data.get("tasks", []):
-                    total_tasks += 1
-                    if task.get("success"):
-                        successful_tasks += 1
-                    
-                    # Count potential vulnerabilities
-                    output = task.get("output", "").lower()
-                    if any(keyword in output for keyword in ["vulnerability", "exploit", "weak", "missing", "exposed"]):
-                        summary["vulnerabilities_found"] += 1
-        
-        # Remove duplicates and calculate success rate
-        summary["total_tools_used"] = list(set(summary["total_tools_used"]))
-        summary["success_rate"] = (successful_tasks / max(total_tasks, 1)) * 100
-        
-        # Generate recommendations based on findings
-        if summary["vulnerabilities_found"] > 0:
-            summary["recommendations"].append("High priority: Address identified vulnerabilities immediately")
-        if summary["total_findings"] < 5:
-            summary["recommendations"].append("Medium priority: Consider more comprehensive testing")
-        
-        summary["recommendations"].append("Monitor and re-test after remediation")
-        
-        return summary
+        return summarize_pentest_results(results)
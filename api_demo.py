@@ -4,64 +4,124 @@ API Endpoints Demo for PenTest AI with MongoDB Logging
 This script demonstrates all the new MongoDB logging and retrieval endpoints
 """
 
+import io
+import os
+import sys
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-API_BASE = "http://localhost:8000"
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    try:
+        import ujson
+        _json_loads = ujson.loads
+    except ImportError:
+        _json_loads = json.loads
+
+# IP literal skips a resolver lookup per request; override with API_BASE
+API_BASE = os.environ.get("API_BASE", "http://127.0.0.1:8000")
+TIMEOUT = (1.0, 10.0)  # (connect, read) seconds
+ERROR_BODY_LIMIT = 4096
+
+# Shared keep-alive session so parallel workers reuse pooled connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                       max_retries=Retry(total=2, backoff_factor=0.1))
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+SESSION.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+
+def dumps_pretty(data):
+    """Pretty-print a JSON payload, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2, default=str)
+
+def parse_json(response):
+    """Parse raw response bytes with the fastest available JSON loader"""
+    return _json_loads(response.content)
 
 def test_api_endpoint(endpoint, description):
-    """Test an API endpoint and display results"""
-    print(f"\n{'='*60}")
-    print(f"🔧 Testing: {description}")
-    print(f"📡 Endpoint: {endpoint}")
-    print(f"{'='*60}")
-    
+    """Test an API endpoint and return (description, endpoint, status, body)"""
     try:
-        response = requests.get(f"{API_BASE}{endpoint}", timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            print("✅ SUCCESS")
-            print(f"📊 Response: {json.dumps(data, indent=2, default=str)}")
-        else:
-            print(f"❌ FAILED - Status: {response.status_code}")
-            print(f"📄 Response: {response.text}")
+        with SESSION.get(f"{API_BASE}{endpoint}", stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 200:
+                return description, endpoint, response.status_code, parse_json(response)
+            # Only read a bounded prefix of error bodies
+            error_body = response.raw.read(ERROR_BODY_LIMIT, decode_content=True)
+            return description, endpoint, response.status_code, error_body.decode(errors="replace")
             
     except Exception as e:
-        print(f"❌ ERROR: {e}")
+        return description, endpoint, None, e
+
+def format_result(description, endpoint, status, body):
+    """Render the result of a single endpoint test into a buffer"""
+    buf = io.StringIO()
+    print(f"\n{'='*60}", file=buf)
+    print(f"🔧 Testing: {description}", file=buf)
+    print(f"📡 Endpoint: {endpoint}", file=buf)
+    print(f"{'='*60}", file=buf)
+    
+    if status == 200:
+        print("✅ SUCCESS", file=buf)
+        print(f"📊 Response: {dumps_pretty(body)}", file=buf)
+    elif status is None:
+        print(f"❌ ERROR: {body}", file=buf)
+    else:
+        print(f"❌ FAILED - Status: {status}", file=buf)
+        print(f"📄 Response: {body}", file=buf)
+    return buf
 
 def main():
     print("🚀 PenTest AI API - MongoDB Logging Endpoints Demo")
     print(f"🕒 Test Time: {datetime.now()}")
     print("=" * 80)
     
-    # Test existing endpoints
-    test_api_endpoint("/", "Root endpoint health check")
-    test_api_endpoint("/health", "Health check endpoint")
-    test_api_endpoint("/agents", "List available agents")
-    test_api_endpoint("/tools", "List available tools")
-    test_api_endpoint("/models/status", "Ollama model status")
+    tasks = [
+        # Test existing endpoints
+        ("/", "Root endpoint health check"),
+        ("/health", "Health check endpoint"),
+        ("/agents", "List available agents"),
+        ("/tools", "List available tools"),
+        ("/models/status", "Ollama model status"),
+        
+        # Test new MongoDB logging endpoints
+        ("/database/stats", "Database statistics"),
+        ("/agents/actions", "Agent actions (default limit)"),
+        ("/agents/actions?limit=5", "Agent actions (limit 5)"),
+        ("/agents/actions?agent_role=PentestCrew", "Agent actions (filter by role)"),
+        ("/commands/executions", "Command executions (default limit)"),
+        ("/commands/executions?limit=3", "Command executions (limit 3)"),
+        ("/sessions/recent", "Recent sessions"),
+    ]
+    
+    # Dispatch all endpoints in parallel, print in submission order
+    with ThreadPoolExecutor(max_workers=12) as ex:
+        results = list(ex.map(lambda t: test_api_endpoint(*t), tasks))
     
-    # Test new MongoDB logging endpoints
-    test_api_endpoint("/database/stats", "Database statistics")
-    test_api_endpoint("/agents/actions", "Agent actions (default limit)")
-    test_api_endpoint("/agents/actions?limit=5", "Agent actions (limit 5)")
-    test_api_endpoint("/agents/actions?agent_role=PentestCrew", "Agent actions (filter by role)")
-    test_api_endpoint("/commands/executions", "Command executions (default limit)")
-    test_api_endpoint("/commands/executions?limit=3", "Command executions (limit 3)")
-    test_api_endpoint("/sessions/recent", "Recent sessions")
+    # Single buffered write keeps output ordered and avoids per-line flushes
+    sys.stdout.writelines([format_result(*result).getvalue() for result in results])
+    sys.stdout.flush()
     
     # Test session-specific endpoint if we have a session ID
     try:
-        stats_response = requests.get(f"{API_BASE}/database/stats")
-        if stats_response.status_code == 200:
-            stats_data = stats_response.json()
+        stats_result = next(r for r in results if r[1] == "/database/stats")
+        if stats_result[2] == 200:
+            stats_data = stats_result[3]
             recent_results = stats_data.get('recent_results', [])
             if recent_results:
                 session_id = recent_results[0].get('session_id')
                 if session_id:
-                    test_api_endpoint(f"/sessions/{session_id}/summary", f"Session summary for {session_id}")
+                    summary = test_api_endpoint(f"/sessions/{session_id}/summary", f"Session summary for {session_id}")
+                    sys.stdout.write(format_result(*summary).getvalue())
     except:
         pass
     
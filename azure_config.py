@@ -3,58 +3,118 @@ Azure-specific configuration and utilities for the AI-Guided Penetration Testing
 """
 
 import os
+import time
 import logging
-from typing import Optional, Dict, Any
-from azure.keyvault.secrets import SecretClient
-from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
-from azure.core.exceptions import AzureError
-from fastapi import HTTPException
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple, List
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Process-wide credential so the AAD token cache is shared by every SecretClient
+_CREDENTIAL = None
+_CREDENTIAL_LOCK = threading.Lock()
+
+def _get_credential():
+    """Lazily build the shared Azure credential for this environment"""
+    global _CREDENTIAL
+    if _CREDENTIAL is None:
+        with _CREDENTIAL_LOCK:
+            if _CREDENTIAL is None:
+                from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
+                
+                # Use managed identity in Azure or default credential locally
+                if os.getenv("ENVIRONMENT") == "production":
+                    _CREDENTIAL = ManagedIdentityCredential()
+                else:
+                    _CREDENTIAL = DefaultAzureCredential(
+                        exclude_interactive_browser_credential=True,
+                        exclude_visual_studio_code_credential=True
+                    )
+    return _CREDENTIAL
+
 class AzureKeyVaultManager:
     """Manages Azure Key Vault operations for secure secret retrieval"""
     
     def __init__(self):
         self.vault_url = os.getenv("AZURE_KEYVAULT_URL")
         self.client = None
+        self._AzureError = Exception
+        
+        # secret_name -> (fetched_at, value, found); missing secrets expire sooner
+        self._cache: Dict[str, Tuple[float, Optional[str], bool]] = {}
+        self._cache_lock = threading.Lock()
+        self.ttl = int(os.getenv("KV_CACHE_TTL", "300"))
+        self.negative_ttl = int(os.getenv("KV_NEGATIVE_CACHE_TTL", "30"))
+        # Bumped on every write so dependent caches know to rebuild
+        self.generation = 0
         
         if self.vault_url:
             try:
-                # Use managed identity in Azure or default credential locally
-                credential = ManagedIdentityCredential() if os.getenv("ENVIRONMENT") == "production" else DefaultAzureCredential()
-                self.client = SecretClient(vault_url=self.vault_url, credential=credential)
+                # Azure SDKs are heavy; only import them when a vault is configured
+                from azure.keyvault.secrets import SecretClient
+                from azure.core.exceptions import AzureError
+                self._AzureError = AzureError
+                
+                self.client = SecretClient(vault_url=self.vault_url, credential=_get_credential())
                 logger.info(f"✅ Azure Key Vault client initialized for {self.vault_url}")
             except Exception as e:
                 logger.warning(f"⚠️ Failed to initialize Key Vault client: {e}")
     
-    def get_secret(self, secret_name: str, default_value: Optional[str] = None) -> Optional[str]:
+    def get_secret(self, secret_name: str, default_value: Optional[str] = None, refresh: bool = False) -> Optional[str]:
         """
         Retrieve a secret from Azure Key Vault
         
         Args:
             secret_name: Name of the secret to retrieve
             default_value: Default value if secret not found
+            refresh: Skip the cache and fetch from the vault
             
         Returns:
             Secret value or default value
         """
         if not self.client:
-            logger.warning(f"Key Vault client not available, using default for {secret_name}")
+            # Settings are read through here on every access; stay quiet when there is no vault
+            logger.debug(f"Key Vault client not available, using default for {secret_name}")
             return default_value
         
+        now = time.monotonic()
+        hit = None if refresh else self._cache.get(secret_name)
+        if hit:
+            fetched_at, value, found = hit
+            if now - fetched_at < (self.ttl if found else self.negative_ttl):
+                return value if found else default_value
+        
         try:
             secret = self.client.get_secret(secret_name)
             logger.info(f"✅ Retrieved secret: {secret_name}")
+            with self._cache_lock:
+                self._cache[secret_name] = (now, secret.value, True)
             return secret.value
-        except AzureError as e:
+        except self._AzureError as e:
             logger.warning(f"⚠️ Failed to retrieve secret {secret_name}: {e}")
+            with self._cache_lock:
+                self._cache[secret_name] = (now, None, False)
             return default_value
         except Exception as e:
             logger.error(f"❌ Unexpected error retrieving secret {secret_name}: {e}")
             return default_value
     
+    def prefetch(self, secret_names: List[str], refresh: bool = False) -> None:
+        """
+        Warm the secret cache by fetching several secrets concurrently
+        
+        Args:
+            secret_names: Names of the secrets to fetch
+            refresh: Re-fetch even the secrets that are still cached
+        """
+        if not self.client or not secret_names:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(4, len(secret_names))) as executor:
+            list(executor.map(lambda name: self.get_secret(name, refresh=refresh), secret_names))
+    
     def set_secret(self, secret_name: str, secret_value: str) -> bool:
         """
         Set a secret in Azure Key Vault
@@ -72,56 +132,119 @@ class AzureKeyVaultManager:
         
         try:
             self.client.set_secret(secret_name, secret_value)
+            with self._cache_lock:
+                self._cache.pop(secret_name, None)
+                self.generation += 1
             logger.info(f"✅ Set secret: {secret_name}")
             return True
-        except AzureError as e:
+        except self._AzureError as e:
             logger.error(f"❌ Failed to set secret {secret_name}: {e}")
             return False
 
 class AzureConfiguration:
     """Azure-specific configuration management"""
     
+    # Secrets read by the accessors below, fetched together by get_all_config
+    SECRET_NAMES = ["mongodb-uri", "ollama-host", "api-secret-key", "appinsights-key"]
+    
     def __init__(self):
         self.kv_manager = AzureKeyVaultManager()
-        self._config_cache = {}
+        # (built_at, kv_generation, config) for get_all_config
+        self._config_cache: Optional[Tuple[float, int, Dict[str, Any]]] = None
+        # No Key Vault calls here: this runs at import. The first get_all_config()
+        # (the app's lifespan) fetches SECRET_NAMES concurrently.
     
-    def get_mongodb_uri(self) -> str:
-        """Get MongoDB connection URI from Key Vault or environment"""
+    # Secret-backed settings are resolved on each read; get_secret's TTL cache keeps that
+    # cheap while still picking up rotated secrets
+    @property
+    def mongodb_uri(self) -> str:
+        """MongoDB connection URI from Key Vault or environment"""
         uri = self.kv_manager.get_secret("mongodb-uri", os.getenv("MONGODB_URI"))
         if not uri:
+            from fastapi import HTTPException
             raise HTTPException(status_code=500, detail="MongoDB URI not configured")
         return uri
     
-    def get_ollama_host(self) -> str:
-        """Get Ollama host configuration"""
+    @property
+    def ollama_host(self) -> str:
+        """Ollama host configuration"""
         return self.kv_manager.get_secret("ollama-host", os.getenv("OLLAMA_HOST", "http://localhost:11434"))
     
-    def get_api_secret_key(self) -> str:
-        """Get API secret key for authentication"""
+    @property
+    def api_secret_key(self) -> str:
+        """API secret key for authentication"""
         key = self.kv_manager.get_secret("api-secret-key", os.getenv("SECRET_KEY"))
         if not key:
             logger.warning("⚠️ No API secret key configured, using default")
             return "default-insecure-key-change-in-production"
         return key
     
+    @property
+    def application_insights_key(self) -> Optional[str]:
+        """Application Insights instrumentation key"""
+        return self.kv_manager.get_secret("appinsights-key", os.getenv("APPINSIGHTS_INSTRUMENTATIONKEY"))
+    
+    @property
+    def production(self) -> bool:
+        """Whether running in production environment"""
+        return os.getenv("ENVIRONMENT", "development").lower() == "production"
+    
+    def invalidate(self):
+        """Drop the get_all_config snapshot so the next call rebuilds it"""
+        self._config_cache = None
+    
+    def get_mongodb_uri(self) -> str:
+        """Get MongoDB connection URI from Key Vault or environment"""
+        return self.mongodb_uri
+    
+    def get_ollama_host(self) -> str:
+        """Get Ollama host configuration"""
+        return self.ollama_host
+    
+    def get_api_secret_key(self) -> str:
+        """Get API secret key for authentication"""
+        return self.api_secret_key
+    
     def get_application_insights_key(self) -> Optional[str]:
         """Get Application Insights instrumentation key"""
-        return self.kv_manager.get_secret("appinsights-key", os.getenv("APPINSIGHTS_INSTRUMENTATIONKEY"))
+        return self.application_insights_key
     
     def is_production(self) -> bool:
         """Check if running in production environment"""
-        return os.getenv("ENVIRONMENT", "development").lower() == "production"
+        return self.production
     
     def get_all_config(self) -> Dict[str, Any]:
         """Get all configuration as a dictionary"""
-        return {
+        now = time.monotonic()
+        cached = self._config_cache
+        if cached:
+            built_at, generation, config = cached
+            if generation != self.kv_manager.generation:
+                self.invalidate()
+            elif now - built_at < self.kv_manager.ttl:
+                return dict(config)
+        
+        # Rebuilding: fetch the secrets afresh (concurrently) rather than reusing cache entries
+        # that may be nearly a TTL old, so the snapshot is never older than one TTL
+        self.kv_manager.prefetch(self.SECRET_NAMES, refresh=True)
+        now = time.monotonic()
+        
+        # Health/status callers should never fail on an unset MongoDB URI
+        try:
+            mongodb_configured = bool(self.mongodb_uri)
+        except Exception:
+            mongodb_configured = False
+        
+        config = {
             "environment": os.getenv("ENVIRONMENT", "development"),
             "azure_keyvault_url": self.kv_manager.vault_url,
-            "mongodb_configured": bool(self.get_mongodb_uri()),
-            "ollama_host": self.get_ollama_host(),
-            "application_insights_configured": bool(self.get_application_insights_key()),
-            "is_production": self.is_production()
+            "mongodb_configured": mongodb_configured,
+            "ollama_host": self.ollama_host,
+            "application_insights_configured": bool(self.application_insights_key),
+            "is_production": self.production
         }
+        self._config_cache = (now, self.kv_manager.generation, config)
+        return dict(config)
 
 # Global configuration instance
 azure_config = AzureConfiguration()
@@ -0,0 +1,92 @@
+"""
+In-process caching helpers shared by the API entry points
+"""
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class TimedLRUCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, asyncio.Lock] = {}
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                return True, entry[0]
+        return False, None
+
+    def _store(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            Tuple of (value, hit) where hit is True if served from cache
+        """
+        hit, value = self._lookup(key)
+        if hit:
+            return value, True
+
+        # Compute outside the lock so slow producers don't serialize other keys
+        value = compute()
+        self._store(key, value)
+        return value, False
+
+    async def get_or_compute_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Async variant of get_or_compute that coalesces concurrent misses for the same key
+
+        Only the first caller runs compute; others waiting on the same key reuse its result.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument coroutine function producing the value
+
+        Returns:
+            Tuple of (value, hit) where hit is True if served from cache
+        """
+        hit, value = self._lookup(key)
+        if hit:
+            return value, True
+
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                hit, value = self._lookup(key)
+                if hit:
+                    return value, True
+                value = await compute()
+                self._store(key, value)
+                return value, False
+        finally:
+            if not lock.locked() and self._key_locks.get(key) is lock:
+                del self._key_locks[key]
+
+    def clear(self) -> int:
+        """Drop all entries and return how many were removed"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
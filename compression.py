@@ -0,0 +1,34 @@
+"""
+Response compression shared by the API entry points
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Compressing these would hold events in the gzip buffer until it fills
+STREAMING_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+class _StreamAwareGZipResponder(GZipResponder):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message):
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.passthrough = content_type.startswith(STREAMING_MEDIA_TYPES)
+        if self.passthrough:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves SSE/NDJSON streams uncompressed so events are delivered immediately"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _StreamAwareGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -1,41 +1,41 @@
-from pydantic import BaseModel
-from typing import Optional
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any
 import os
 
-class Settings(BaseModel):
+# Environment is resolved once at import so constructing Settings is pure in-memory
+_ENV = {
+    'api_host': os.getenv('API_HOST', '0.0.0.0'),
+    'api_port': int(os.getenv('API_PORT', '8000') or 8000),
+    'ollama_model': os.getenv('OLLAMA_MODEL', 'deepseek-r1:1.5b'),
+    'ollama_base_url': os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434'),
+    'log_level': os.getenv('LOG_LEVEL', 'INFO'),
+    'serper_api_key': os.getenv('SERPER_API_KEY'),
+    'openai_api_key': os.getenv('OPENAI_API_KEY'),
+}
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings"""
     
     # API Configuration
-    api_host: str = "0.0.0.0"
-    api_port: int = 8000
+    api_host: str = _ENV['api_host']
+    api_port: int = _ENV['api_port']
     debug: bool = False
     
     # Ollama Configuration
-    ollama_model: str = "deepseek-r1:1.5b"
-    ollama_base_url: str = "http://localhost:11434"
+    ollama_model: str = _ENV['ollama_model']
+    ollama_base_url: str = _ENV['ollama_base_url']
     
     # Logging
-    log_level: str = "INFO"
+    log_level: str = _ENV['log_level']
     
     # Optional API Keys
-    serper_api_key: Optional[str] = None
-    openai_api_key: Optional[str] = None
+    serper_api_key: Optional[str] = _ENV['serper_api_key']
+    openai_api_key: Optional[str] = _ENV['openai_api_key']
     
-    def __init__(self, **kwargs):
-        # Load from environment variables
-        env_values = {
-            'api_host': os.getenv('API_HOST', '0.0.0.0'),
-            'api_port': int(os.getenv('API_PORT', '8000')),
-            'ollama_model': os.getenv('OLLAMA_MODEL', 'deepseek-r1:1.5b'),
-            'ollama_base_url': os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434'),
-            'log_level': os.getenv('LOG_LEVEL', 'INFO'),
-            'serper_api_key': os.getenv('SERPER_API_KEY'),
-            'openai_api_key': os.getenv('OPENAI_API_KEY'),
-        }
-        
-        # Merge with provided kwargs
-        env_values.update(kwargs)
-        super().__init__(**env_values)
+    def model_dump(self) -> Dict[str, Any]:
+        """Serialize settings to a dict (pydantic-compatible name)"""
+        return asdict(self)
 
 # Global settings instance
 settings = Settings()
@@ -1,43 +1,254 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, HTTPException, Depends, Request
+from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.concurrency import run_in_threadpool
+from anyio import to_thread
 import asyncio
+import hashlib
+import httpx
 import uvicorn
 import os
+import re
+import time
+import uuid
 from agents.pentest_crew import PentestCrew
 from models.ollama_manager import OllamaManager
 from tools import ToolManager
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Any, List, Optional
 import logging
+import logging.handlers
+import queue
+import orjson
 from azure_config import azure_config, configure_azure_logging, get_azure_health_info
+import task_queue
+
+try:
+    from slowapi import Limiter, _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+    from slowapi.util import get_remote_address
+    SLOWAPI_AVAILABLE = True
+except ImportError:
+    SLOWAPI_AVAILABLE = False
+from cache_utils import TimedLRUCache
+from compression import StreamAwareGZipMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Azure logging if available
-configure_azure_logging()
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+def _install_queue_logging():
+    """Move root handlers behind a QueueListener so request paths never block on log I/O"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+
+# Health payload is cached briefly so liveness probes don't rebuild it every poll
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "30"))
+_health_cache = {"payload": None, "expires": 0.0}
+_health_lock = asyncio.Lock()
+
+# AI guidance is idempotent over short windows; avoid an LLM round-trip per poll
+AI_GUIDANCE_CACHE_TTL = float(os.getenv("AI_GUIDANCE_CACHE_TTL", "60"))
+_next_task_cache = TimedLRUCache(ttl=AI_GUIDANCE_CACHE_TTL, maxsize=256)
+_analysis_cache = TimedLRUCache(ttl=AI_GUIDANCE_CACHE_TTL, maxsize=256)
+
+# Upper bound on a single tool run when several are fanned out together
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "600"))
+
+# Per-client request budget and global concurrency cap for the heavy scan endpoints
+PENTEST_RATE_LIMIT = os.getenv("PENTEST_RATE_LIMIT", "30/minute")
+MAX_CONCURRENT_PENTESTS = int(os.getenv("MAX_CONCURRENT_PENTESTS", "5"))
+_pentest_semaphore = asyncio.Semaphore(MAX_CONCURRENT_PENTESTS)
+
+# Pooled connections to Ollama shared by every OllamaManager call
+OLLAMA_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Cap on anyio's worker threads behind run_in_threadpool and sync endpoints
+THREAD_LIMIT = int(os.getenv("THREAD_LIMIT", "32"))
+
+# How long model-backed endpoints wait for the background warmup before giving up
+MODEL_READY_TIMEOUT = float(os.getenv("MODEL_READY_TIMEOUT", "5"))
+
+async def _warm_model(app: FastAPI):
+    """Connect to Ollama and pull the model in the background, then signal readiness"""
+    try:
+        ollama_host = azure_config.get_ollama_host()
+        logger.info("Connecting to Ollama at: %s", ollama_host)
+        app.state.model_available = await get_ollama_manager().ensure_model_available()
+        
+        if app.state.model_available:
+            logger.info("✅ Ollama model warmed up and ready")
+        else:
+            logger.warning("⚠️ Ollama model not available, proceeding with limited functionality")
+    except Exception as e:
+        logger.error("❌ Model warmup error: %s", e)
+        logger.info("The API will work with basic functionality. Install Ollama manually for full AI features.")
+    finally:
+        # Set even on failure so waiters fall through to the fallback LLM
+        app.state.model_ready.set()
+
+async def _probe_mongo() -> bool:
+    """Build the shared crew, which opens the MongoDB connection"""
+    crew = await get_crew()
+    return crew.mongodb.is_connected()
+
+async def _probe_tools() -> ToolManager:
+    """Instantiate the ToolManager off the event loop"""
+    return await run_in_threadpool(get_tool_manager)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize shared services concurrently on startup and flush logs on shutdown"""
+    global _log_listener, _ollama_http
+    to_thread.current_default_thread_limiter().total_tokens = THREAD_LIMIT
+    
+    # Key Vault is first read here, not at import; the secrets are fetched concurrently off the loop
+    azure_health = await run_in_threadpool(get_azure_health_info)
+    # Configure Azure logging if available, before handlers move behind the queue
+    await run_in_threadpool(configure_azure_logging)
+    _install_queue_logging()
+    logger.info("🚀 Starting up PenTest AI API on Azure...")
+    
+    # Log Azure configuration
+    logger.info("Azure Configuration: %s", azure_health)
+    
+    # One keep-alive pool for all Ollama traffic; created before the manager that uses it
+    _ollama_http = app.state.http = httpx.AsyncClient(
+        base_url=azure_config.get_ollama_host(),
+        timeout=30,
+        limits=OLLAMA_HTTP_LIMITS
+    )
+    
+    # A model pull can take minutes; serve traffic while it happens
+    app.state.model_available = False
+    app.state.model_ready = asyncio.Event()
+    app.state.model_warmup = asyncio.create_task(_warm_model(app))
+    
+    # Cold start costs max(probe) rather than the sum of all of them
+    mongo_ok, tool_manager = await asyncio.gather(
+        _probe_mongo(), _probe_tools(), return_exceptions=True
+    )
+    
+    if isinstance(mongo_ok, Exception):
+        logger.error("❌ Failed to initialize PentestCrew: %s", mongo_ok)
+        mongo_ok = False
+    else:
+        app.state.crew = _crew_singleton
+    
+    if isinstance(tool_manager, Exception):
+        logger.error("❌ Failed to initialize ToolManager: %s", tool_manager)
+        tool_manager = None
+    
+    app.state.ollama_manager = get_ollama_manager()
+    app.state.mongo_ok = mongo_ok
+    app.state.tool_manager = tool_manager
+    logger.info("✅ Startup completed; model warmup continues in the background")
+    
+    try:
+        yield
+    finally:
+        app.state.model_warmup.cancel()
+        if _crew_singleton is not None:
+            await _crew_singleton.aclose()
+        await app.state.http.aclose()
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
 
 app = FastAPI(
     title="PenTest AI API - Azure Deployment",
     description="FastAPI application with CrewAI agents for penetration testing using Ollama Deepseek model - Optimized for Azure App Service",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+class FastCORSMiddleware:
+    """CORS middleware with a precompiled origin check and a no-Origin fast path"""
+    
+    # Origins allowed for the frontend and Azure App Service (*.azurewebsites.net)
+    ORIGIN_RE = re.compile(r"^(http://localhost:(3000|8000)|https://[^/]+\.azurewebsites\.net)$")
+    PREFLIGHT_HEADERS = [
+        (b"access-control-allow-methods", b"GET, POST, PUT, DELETE"),
+        (b"access-control-allow-credentials", b"true"),
+        (b"access-control-max-age", b"86400"),  # let browsers cache preflights for 24h
+        (b"vary", b"Origin"),
+    ]
+    SIMPLE_HEADERS = [
+        (b"access-control-allow-credentials", b"true"),
+        (b"vary", b"Origin"),
+    ]
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        origin = request_method = request_headers = None
+        for key, value in scope["headers"]:
+            if key == b"origin":
+                origin = value
+            elif key == b"access-control-request-method":
+                request_method = value
+            elif key == b"access-control-request-headers":
+                request_headers = value
+        
+        # Same-origin and non-browser requests skip all CORS work
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+        
+        allowed = self.ORIGIN_RE.match(origin.decode("latin-1")) is not None
+        
+        # Answer preflights directly without invoking the app
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            if not allowed:
+                response = PlainTextResponse("Disallowed CORS origin", status_code=400)
+            else:
+                response = PlainTextResponse("OK", status_code=200)
+                response.raw_headers.append((b"access-control-allow-origin", origin))
+                response.raw_headers.extend(self.PREFLIGHT_HEADERS)
+                if request_headers:
+                    response.raw_headers.append((b"access-control-allow-headers", request_headers))
+            await response(scope, receive, send)
+            return
+        
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"access-control-allow-origin", origin))
+                headers.extend(self.SIMPLE_HEADERS)
+                message["headers"] = headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cors)
+
 # Configure CORS for Azure
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:8000",
-        "https://*.azurewebsites.net"
-    ],
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORSMiddleware)
+
+# Compress large JSON reports; added after CORS so it wraps it and small preflights stay untouched
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Configure trusted hosts for Azure
 if azure_config.is_production():
@@ -46,229 +257,396 @@ if azure_config.is_production():
         allowed_hosts=["*.azurewebsites.net", "localhost"]
     )
 
+# Shed abusive clients with 429 before they tie up workers
+if SLOWAPI_AVAILABLE:
+    limiter = Limiter(key_func=get_remote_address)
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+    rate_limit = limiter.limit(PENTEST_RATE_LIMIT)
+else:
+    logger.warning("⚠️ slowapi not installed, per-client rate limiting disabled")
+    
+    def rate_limit(func):
+        return func
+
+async def heavy_slot():
+    """Hold one of the limited scan slots for the lifetime of the request"""
+    async with _pentest_semaphore:
+        yield
+
+# Process-wide singletons; building these per request reconnects to MongoDB/Ollama every call
+_crew_singleton: Optional[PentestCrew] = None
+_crew_lock = asyncio.Lock()
+_ollama_manager: Optional[OllamaManager] = None
+_ollama_http: Optional[httpx.AsyncClient] = None
+_tool_manager: Optional[ToolManager] = None
+
+async def get_crew() -> PentestCrew:
+    """Return the shared PentestCrew, creating it on first use"""
+    global _crew_singleton
+    if _crew_singleton is None:
+        async with _crew_lock:
+            if _crew_singleton is None:
+                # Construction connects to MongoDB; keep it off the event loop
+                _crew_singleton = await run_in_threadpool(PentestCrew)
+    return _crew_singleton
+
+def get_ollama_manager() -> OllamaManager:
+    """Return the shared OllamaManager, creating it on first use"""
+    global _ollama_manager
+    if _ollama_manager is None:
+        _ollama_manager = OllamaManager(http_client=_ollama_http)
+    return _ollama_manager
+
+def get_tool_manager() -> ToolManager:
+    """Return the shared ToolManager, creating it on first use"""
+    global _tool_manager
+    if _tool_manager is None:
+        _tool_manager = ToolManager()
+    return _tool_manager
+
+async def wait_for_model(request: Request):
+    """Hold model-backed requests briefly while the warmup finishes"""
+    try:
+        await asyncio.wait_for(request.app.state.model_ready.wait(), timeout=MODEL_READY_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="AI model is still warming up", headers={"Retry-After": "30"})
+
 class PentestRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', populate_by_name=True)
+    
     target: str
     scope: str = "basic"
     agents: Optional[List[str]] = None  # Specify which agents to invoke
     tools: Optional[List[str]] = None   # Specify which tools to use
-    additional_params: Dict[str, Any] = {}
+    additional_params: Dict[str, Any] = Field(default_factory=dict)
+
+class AIPhaseRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', populate_by_name=True)
+    
+    target: str = Field(min_length=1)
+    agent_role: str = "Reconnaissance Specialist"
+    phase_name: str = "reconnaissance"
+    session_id: Optional[str] = None
 
 class PentestResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     status: str
     message: str
-    results: Dict[str, Any] = {}
+    results: Dict[str, Any] = Field(default_factory=dict)
 
 class AgentInfo(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     name: str
     role: str
     description: str
 
 class ToolInfo(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     name: str
     description: str
     available: bool
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize Ollama and download Deepseek model on startup"""
-    logger.info("🚀 Starting up PenTest AI API on Azure...")
-    
-    # Log Azure configuration
-    azure_health = get_azure_health_info()
-    logger.info(f"Azure Configuration: {azure_health}")
-    
-    try:
-        # Initialize Ollama with Azure configuration
-        ollama_host = azure_config.get_ollama_host()
-        logger.info(f"Connecting to Ollama at: {ollama_host}")
-        
-        ollama_manager = OllamaManager()
-        model_available = await ollama_manager.ensure_model_available()
-        
-        if model_available:
-            logger.info("✅ Startup completed successfully with Ollama integration")
-        else:
-            logger.warning("⚠️ Ollama model not available, proceeding with limited functionality")
-    except Exception as e:
-        logger.error(f"❌ Startup error: {e}")
-        logger.info("The API will work with basic functionality. Install Ollama manually for full AI features.")
+# Static payloads are encoded once at import and served as raw bytes
+AGENTS = [
+    AgentInfo(
+        name="recon",
+        role="Reconnaissance Specialist", 
+        description="Performs comprehensive reconnaissance using nmap, enum4linux, and nikto"
+    ),
+    AgentInfo(
+        name="vulnerability",
+        role="Vulnerability Assessment Expert",
+        description="Identifies vulnerabilities using sqlmap, OWASP ZAP, Burp Suite, and nikto"
+    ),
+    AgentInfo(
+        name="exploitation", 
+        role="Exploitation Specialist",
+        description="Performs controlled exploitation using Metasploit, Hydra, and John the Ripper"
+    ),
+    AgentInfo(
+        name="reporting",
+        role="Security Report Analyst", 
+        description="Generates comprehensive security reports from tool outputs"
+    )
+]
+_AGENTS_JSON = orjson.dumps([agent.model_dump() for agent in AGENTS])
+
+AI_AGENTS = {
+    "agents": [
+        {
+            "role": "Reconnaissance Specialist",
+            "description": "Gathers comprehensive information about target systems using tools like nmap, enum4linux, and nikto",
+            "capabilities": ["network_scanning", "service_identification", "information_gathering"],
+            "primary_tools": ["nmap", "nikto", "enum4linux"]
+        },
+        {
+            "role": "Vulnerability Assessment Expert", 
+            "description": "Identifies and analyzes security vulnerabilities using specialized tools",
+            "capabilities": ["vulnerability_scanning", "web_app_testing", "risk_assessment"],
+            "primary_tools": ["sqlmap", "zap", "burp", "nikto"]
+        },
+        {
+            "role": "Exploitation Specialist",
+            "description": "Safely demonstrates and validates identified vulnerabilities",
+            "capabilities": ["exploitation", "privilege_escalation", "proof_of_concept"],
+            "primary_tools": ["metasploit", "hydra", "john"]
+        },
+        {
+            "role": "Security Report Analyst",
+            "description": "Generates comprehensive and actionable security reports",
+            "capabilities": ["report_generation", "risk_analysis", "recommendations"],
+            "primary_tools": ["analysis", "reporting", "documentation"]
+        }
+    ],
+    "ai_guidance_enabled": True,
+    "model_backend": "ollama_deepseek"
+}
+_AI_AGENTS_JSON = orjson.dumps(AI_AGENTS)
+
+_ROOT_JSON = orjson.dumps({
+    "message": "PenTest AI API is running on Azure",
+    "status": "healthy",
+    "version": "2.0.0",
+    "environment": os.getenv("ENVIRONMENT", "development"),
+    "docs": "/docs",
+    "health": "/health"
+})
+
+TOOL_DESCRIPTIONS = {
+    'nmap': 'Network discovery and security auditing',
+    'burp': 'Web application security testing',
+    'zap': 'OWASP ZAP web application security scanner',
+    'sqlmap': 'Automatic SQL injection and database takeover tool',
+    'nikto': 'Web server vulnerability scanner',
+    'hydra': 'Password brute-forcing tool',
+    'enum4linux': 'SMB/NetBIOS enumeration tool',
+    'john': 'John the Ripper password cracking tool',
+    'wireshark': 'Network packet analyzer',
+    'metasploit': 'Penetration testing framework'
+}
+
+def _etag(body: bytes) -> str:
+    """Strong ETag for a pre-encoded response body"""
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+_ROOT_ETAG = _etag(_ROOT_JSON)
+_AGENTS_ETAG = _etag(_AGENTS_JSON)
+_AI_AGENTS_ETAG = _etag(_AI_AGENTS_JSON)
+
+# (body, etag) for /tools, built on first request from the shared ToolManager
+_tools_payload: Optional[tuple] = None
+
+def static_json(request: Request, body: bytes, etag: str) -> Response:
+    """Serve pre-encoded JSON, answering matching If-None-Match with 304"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json",
+                    headers={"ETag": etag, "Cache-Control": "public, max-age=60"})
+
+async def _queue_pentest(target: str, scope: str, params: Dict[str, Any]) -> ORJSONResponse:
+    """Queue a pentest workflow and return 202 with the task ID"""
+    task_id = await run_in_threadpool(task_queue.enqueue_pentest, target, scope, params)
+    return ORJSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "message": f"Penetration test queued for {target}",
+            "task_id": task_id,
+            "status_url": f"/tasks/{task_id}"
+        }
+    )
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint with Azure deployment information"""
-    return {
-        "message": "PenTest AI API is running on Azure",
-        "status": "healthy",
-        "version": "2.0.0",
-        "environment": azure_config.get_all_config()["environment"],
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return static_json(request, _ROOT_JSON, _ROOT_ETAG)
 
 @app.get("/health")
 async def health_check():
     """Comprehensive health check endpoint for Azure monitoring"""
-    try:
-        # Get Azure-specific health information
-        azure_health = get_azure_health_info()
-        
-        # Check tool availability
-        tool_manager = ToolManager()
-        available_tools = tool_manager.get_available_tools()
-        
-        health_status = {
-            "status": "healthy",
-            "timestamp": "2025-01-06T12:00:00Z",
-            "version": "2.0.0",
-            "azure": azure_health,
-            "tools": {
-                "available": len(available_tools),
-                "tools": available_tools
-            },
-            "database": {
-                "mongodb_configured": azure_health["services"]["mongodb"]["configured"]
-            },
-            "ai_service": {
-                "ollama_host": azure_health["services"]["ollama"]["host"]
+    cache_headers = {"Cache-Control": f"max-age={int(HEALTH_CACHE_TTL)}"}
+    if time.monotonic() < _health_cache["expires"]:
+        return ORJSONResponse(_health_cache["payload"], headers={**cache_headers, "X-Cache": "HIT"})
+    
+    async with _health_lock:
+        # Another request may have rebuilt the payload while we waited
+        if time.monotonic() < _health_cache["expires"]:
+            return ORJSONResponse(_health_cache["payload"], headers={**cache_headers, "X-Cache": "HIT"})
+        
+        try:
+            # Get Azure-specific health information (refreshes Key Vault secrets once per TTL)
+            azure_health = await run_in_threadpool(get_azure_health_info)
+            
+            # Check tool availability
+            tool_manager = get_tool_manager()
+            available_tools = tool_manager.get_available_tools()
+            
+            health_status = {
+                "status": "healthy",
+                "timestamp": "2025-01-06T12:00:00Z",
+                "version": "2.0.0",
+                "azure": azure_health,
+                "tools": {
+                    "available": len(available_tools),
+                    "tools": available_tools
+                },
+                "database": {
+                    "mongodb_configured": azure_health["services"]["mongodb"]["configured"]
+                },
+                "ai_service": {
+                    "ollama_host": azure_health["services"]["ollama"]["host"],
+                    "ready": app.state.model_ready.is_set(),
+                    "model_available": app.state.model_available
+                }
+            }
+            
+            # Don't pin a not-ready snapshot for the full TTL while the model warms up
+            if app.state.model_ready.is_set():
+                _health_cache["payload"] = health_status
+                _health_cache["expires"] = time.monotonic() + HEALTH_CACHE_TTL
+            return ORJSONResponse(health_status, headers={**cache_headers, "X-Cache": "MISS"})
+        except Exception as e:
+            logger.error("Health check error: %s", e)
+            return {
+                "status": "degraded",
+                "error": str(e),
+                "timestamp": "2025-01-06T12:00:00Z"
             }
-        }
-        
-        return health_status
-    except Exception as e:
-        logger.error(f"Health check error: {e}")
-        return {
-            "status": "degraded",
-            "error": str(e),
-            "timestamp": "2025-01-06T12:00:00Z"
-        }
 
-@app.get("/agents", response_model=List[AgentInfo])
-async def get_available_agents():
+@app.get("/agents", responses={200: {"model": List[AgentInfo]}})
+async def get_available_agents(request: Request):
     """Get list of available penetration testing agents"""
-    agents = [
-        AgentInfo(
-            name="recon",
-            role="Reconnaissance Specialist", 
-            description="Performs comprehensive reconnaissance using nmap, enum4linux, and nikto"
-        ),
-        AgentInfo(
-            name="vulnerability",
-            role="Vulnerability Assessment Expert",
-            description="Identifies vulnerabilities using sqlmap, OWASP ZAP, Burp Suite, and nikto"
-        ),
-        AgentInfo(
-            name="exploitation", 
-            role="Exploitation Specialist",
-            description="Performs controlled exploitation using Metasploit, Hydra, and John the Ripper"
-        ),
-        AgentInfo(
-            name="reporting",
-            role="Security Report Analyst", 
-            description="Generates comprehensive security reports from tool outputs"
-        )
-    ]
-    return agents
+    return static_json(request, _AGENTS_JSON, _AGENTS_ETAG)
 
-@app.get("/tools", response_model=List[ToolInfo])
-async def get_available_tools():
+@app.get("/tools", responses={200: {"model": List[ToolInfo]}})
+async def get_available_tools(request: Request, tool_manager: ToolManager = Depends(get_tool_manager)):
     """Get list of available penetration testing tools"""
+    global _tools_payload
     try:
-        tool_manager = ToolManager()
-        available_tools = tool_manager.get_available_tools()
-        
-        tool_descriptions = {
-            'nmap': 'Network discovery and security auditing',
-            'burp': 'Web application security testing',
-            'zap': 'OWASP ZAP web application security scanner',
-            'sqlmap': 'Automatic SQL injection and database takeover tool',
-            'nikto': 'Web server vulnerability scanner',
-            'hydra': 'Password brute-forcing tool',
-            'enum4linux': 'SMB/NetBIOS enumeration tool',
-            'john': 'John the Ripper password cracking tool',
-            'wireshark': 'Network packet analyzer',
-            'metasploit': 'Penetration testing framework'
-        }
-        
-        tools = []
-        for tool_name in available_tools:
-            tools.append(ToolInfo(
-                name=tool_name,
-                description=tool_descriptions.get(tool_name, f"{tool_name} penetration testing tool"),
-                available=True  # All tools have fallback implementations
-            ))
+        if _tools_payload is None:
+            available_tools = tool_manager.get_available_tools()
+            
+            tools = []
+            for tool_name in available_tools:
+                tools.append(ToolInfo(
+                    name=tool_name,
+                    description=TOOL_DESCRIPTIONS.get(tool_name, f"{tool_name} penetration testing tool"),
+                    available=True  # All tools have fallback implementations
+                ))
+            
+            body = orjson.dumps([tool.model_dump() for tool in tools])
+            _tools_payload = (body, _etag(body))
         
-        return tools
+        return static_json(request, *_tools_payload)
         
     except Exception as e:
-        logger.error(f"Error getting tools: {str(e)}")
+        logger.error("Error getting tools: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get tools: {str(e)}")
 
 @app.post("/tools/{tool_name}/execute")
-async def execute_tool(tool_name: str, target: str, options: Dict[str, Any] = {}):
-    """Execute a specific penetration testing tool"""
+async def execute_tool(tool_name: str, target: str, options: Dict[str, Any] = {}, session_id: Optional[str] = None,
+                       pentest_crew: PentestCrew = Depends(get_crew)):
+    """Execute a specific penetration testing tool, logged under the caller's session (or a new one)"""
     try:
-        pentest_crew = PentestCrew()
-        result = pentest_crew.execute_tool(tool_name, target, **options)
+        session_id = session_id or str(uuid.uuid4())
+        result = await run_in_threadpool(pentest_crew.execute_tool, tool_name, target, session_id, **options)
         
         return {
             "status": "success",
             "tool": tool_name,
             "target": target,
-            "result": result
+            "result": result,
+            "session_id": session_id
         }
         
     except Exception as e:
-        logger.error(f"Error executing tool {tool_name}: {str(e)}")
+        logger.error("Error executing tool %s: %s", tool_name, e)
         raise HTTPException(status_code=500, detail=f"Failed to execute tool: {str(e)}")
 
-@app.post("/invokePentest", response_model=PentestResponse)
-async def invoke_pentest(request: PentestRequest):
+async def _run_tool(pentest_crew: PentestCrew, tool_name: str, target: str, params: Dict[str, Any], session_id: str):
+    """Run one tool in the threadpool, returning (tool_name, result) with errors reported inline"""
+    logger.info("Executing tool: %s", tool_name)
+    try:
+        result = await asyncio.wait_for(
+            run_in_threadpool(pentest_crew.execute_tool, tool_name, target, session_id, **params),
+            timeout=TOOL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        result = {"error": f"Timed out after {TOOL_TIMEOUT}s"}
+    except Exception as e:
+        result = {"error": str(e)}
+    return tool_name, result
+
+async def _stream_tool_results(coros):
+    """Yield one NDJSON line per tool as it completes, then a completion line"""
+    for next_done in asyncio.as_completed(coros):
+        tool_name, result = await next_done
+        yield orjson.dumps({"tool": tool_name, "result": result}, default=str) + b"\n"
+    yield orjson.dumps({"status": "completed", "tools": len(coros)}) + b"\n"
+
+@app.post("/invokePentest", response_model=PentestResponse, dependencies=[Depends(heavy_slot)])
+@rate_limit
+async def invoke_pentest(request: Request, pentest_request: PentestRequest, stream: bool = False, pentest_crew: PentestCrew = Depends(get_crew)):
     """
     Invoke CrewAI agents for penetration testing with selective agent invocation
     
     Args:
-        request: PentestRequest containing target, scope, and agent/tool selection
+        pentest_request: PentestRequest containing target, scope, and agent/tool selection
+        stream: Stream tool results as NDJSON lines in completion order (tools only)
     
     Returns:
         PentestResponse with results from the selected penetration testing agents
     """
     try:
-        logger.info(f"Starting pentest for target: {request.target}")
-        logger.info(f"Selected agents: {request.agents}")
-        logger.info(f"Selected tools: {request.tools}")
-        
-        # Initialize the pentest crew
-        pentest_crew = PentestCrew()
+        logger.info("Starting pentest for target: %s", pentest_request.target)
+        logger.info("Selected agents: %s", pentest_request.agents)
+        logger.info("Selected tools: %s", pentest_request.tools)
         
         # If specific tools are requested, execute them directly
-        if request.tools:
-            tool_results = {}
-            for tool_name in request.tools:
-                logger.info(f"Executing tool: {tool_name}")
-                tool_result = pentest_crew.execute_tool(tool_name, request.target, **request.additional_params)
-                tool_results[tool_name] = tool_result
+        if pentest_request.tools:
+            # Tools are independent, so run them concurrently, all under this request's session
+            session_id = str(uuid.uuid4())
+            coros = [_run_tool(pentest_crew, tool_name, pentest_request.target, pentest_request.additional_params, session_id)
+                     for tool_name in pentest_request.tools]
+            
+            # Optionally ship each result as soon as its tool finishes
+            if stream:
+                return StreamingResponse(_stream_tool_results(coros), media_type="application/x-ndjson")
+            
+            tool_results = dict(await asyncio.gather(*coros))
             
             return PentestResponse(
                 status="success",
-                message=f"Tool execution completed for {len(request.tools)} tools",
+                message=f"Tool execution completed for {len(pentest_request.tools)} tools",
                 results={
-                    "target": request.target,
-                    "scope": request.scope,
-                    "selected_tools": request.tools,
+                    "target": pentest_request.target,
+                    "scope": pentest_request.scope,
+                    "selected_tools": pentest_request.tools,
                     "tool_results": tool_results,
-                    "execution_type": "tools_only"
+                    "execution_type": "tools_only",
+                    "session_id": session_id
                 }
             )
         
+        workflow_params = {
+            **pentest_request.additional_params,
+            "selected_agents": pentest_request.agents,
+            "available_tools": pentest_crew.get_available_tools()
+        }
+        
+        # Hand long-running workflows to the task queue when it is configured
+        if task_queue.is_enabled():
+            return await _queue_pentest(pentest_request.target, pentest_request.scope, workflow_params)
+        
         # Execute the penetration testing workflow with selected agents
         results = await pentest_crew.execute_pentest(
-            target=request.target,
-            scope=request.scope,
-            additional_params={
-                **request.additional_params,
-                "selected_agents": request.agents,
-                "available_tools": pentest_crew.get_available_tools()
-            }
+            target=pentest_request.target,
+            scope=pentest_request.scope,
+            additional_params=workflow_params
         )
         
         logger.info("Pentest completed successfully")
@@ -278,23 +656,33 @@ async def invoke_pentest(request: PentestRequest):
             message="Penetration testing completed successfully",
             results={
                 **results,
-                "selected_agents": request.agents,
+                "selected_agents": pentest_request.agents,
                 "available_tools": pentest_crew.get_available_tools()
             }
         )
         
     except Exception as e:
-        logger.error(f"Error during pentest execution: {str(e)}")
+        logger.error("Error during pentest execution: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to execute penetration test: {str(e)}"
         )
 
+@app.get("/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    """Get the status and results of a queued penetration test"""
+    if not task_queue.is_enabled():
+        raise HTTPException(status_code=404, detail="Task queue not configured")
+    
+    status = await run_in_threadpool(task_queue.get_task_status, task_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return {"task_id": task_id, **status}
+
 @app.get("/models/status")
-async def get_model_status():
+async def get_model_status(ollama_manager: OllamaManager = Depends(get_ollama_manager)):
     """Check the status of the Ollama Deepseek model"""
     try:
-        ollama_manager = OllamaManager()
         status = await ollama_manager.get_model_status()
         return status
     except Exception as e:
@@ -304,11 +692,10 @@ async def get_model_status():
         )
 
 @app.get("/database/stats")
-async def get_database_stats():
+async def get_database_stats(pentest_crew: PentestCrew = Depends(get_crew)):
     """Get MongoDB database statistics"""
     try:
-        pentest_crew = PentestCrew()
-        stats = pentest_crew.get_database_stats()
+        stats = await pentest_crew.get_database_stats_async()
         return stats
     except Exception as e:
         raise HTTPException(
@@ -320,12 +707,12 @@ async def get_database_stats():
 async def get_agent_actions(
     agent_role: Optional[str] = None,
     session_id: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    pentest_crew: PentestCrew = Depends(get_crew)
 ):
     """Get agent actions and decisions from MongoDB"""
     try:
-        pentest_crew = PentestCrew()
-        actions = pentest_crew.get_agent_actions(
+        actions = await pentest_crew.get_agent_actions_async(
             agent_role=agent_role,
             session_id=session_id,
             limit=limit
@@ -346,11 +733,10 @@ async def get_agent_actions(
         )
 
 @app.get("/commands/executions")
-async def get_command_executions(limit: int = 50):
+async def get_command_executions(limit: int = 50, pentest_crew: PentestCrew = Depends(get_crew)):
     """Get command executions and their outputs"""
     try:
-        pentest_crew = PentestCrew()
-        executions = pentest_crew.get_command_executions(limit=limit)
+        executions = await pentest_crew.get_command_executions_async(limit=limit)
         return {
             "command_executions": executions,
             "total_count": len(executions),
@@ -363,11 +749,10 @@ async def get_command_executions(limit: int = 50):
         )
 
 @app.get("/sessions/{session_id}/summary")
-async def get_session_summary(session_id: str):
+async def get_session_summary(session_id: str, pentest_crew: PentestCrew = Depends(get_crew)):
     """Get a comprehensive summary of a specific pentest session"""
     try:
-        pentest_crew = PentestCrew()
-        summary = pentest_crew.get_session_summary(session_id)
+        summary = await pentest_crew.get_session_summary_async(session_id)
         return summary
     except Exception as e:
         raise HTTPException(
@@ -375,42 +760,48 @@ async def get_session_summary(session_id: str):
             detail=f"Failed to get session summary: {str(e)}"
         )
 
-@app.post("/ai-guided-pentest")
-async def ai_guided_pentest(request: PentestRequest):
+@app.post("/ai-guided-pentest", dependencies=[Depends(wait_for_model), Depends(heavy_slot)])
+@rate_limit
+async def ai_guided_pentest(request: Request, pentest_request: PentestRequest, pentest_crew: PentestCrew = Depends(get_crew)):
     """Execute AI-guided penetration testing where agents decide their next tasks based on model guidance"""
     try:
-        logger.info(f"Starting AI-guided penetration test for target: {request.target}")
+        logger.info("Starting AI-guided penetration test for target: %s", pentest_request.target)
         
-        pentest_crew = PentestCrew()
+        if task_queue.is_enabled():
+            return await _queue_pentest(pentest_request.target, pentest_request.scope, pentest_request.additional_params)
         
         # Execute AI-guided penetration testing
         results = await pentest_crew.execute_pentest(
-            target=request.target,
-            scope=request.scope,
-            additional_params=request.additional_params
+            target=pentest_request.target,
+            scope=pentest_request.scope,
+            additional_params=pentest_request.additional_params
         )
         
         return PentestResponse(
             status="completed",
-            message=f"AI-guided penetration testing completed for {request.target}",
+            message=f"AI-guided penetration testing completed for {pentest_request.target}",
             results=results
         )
         
     except Exception as e:
-        logger.error(f"AI-guided pentest failed: {str(e)}")
+        logger.error("AI-guided pentest failed: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"AI-guided penetration testing failed: {str(e)}"
         )
 
-@app.get("/ai-guidance/next-task/{target}")
-async def get_next_ai_task(target: str, agent_role: str = "Reconnaissance Specialist"):
-    """Get AI-guided task recommendation for a specific agent and target"""
+@app.get("/ai-guidance/next-task/{target}", dependencies=[Depends(wait_for_model)])
+async def get_next_ai_task(response: Response, target: str, agent_role: str = "Reconnaissance Specialist",
+                          session_id: Optional[str] = None, pentest_crew: PentestCrew = Depends(get_crew)):
+    """Get AI-guided task recommendation for a specific agent and target, based on one session's results"""
     try:
-        pentest_crew = PentestCrew()
-        
         # Get AI-powered task recommendation
-        decision = pentest_crew.task_planner.decide_next_task(target, agent_role)
+        decision, hit = await run_in_threadpool(
+            _next_task_cache.get_or_compute,
+            (session_id, target, agent_role),
+            lambda: pentest_crew.new_task_planner(session_id).decide_next_task(target, agent_role)
+        )
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
         
         return {
             "target": target,
@@ -421,20 +812,24 @@ async def get_next_ai_task(target: str, agent_role: str = "Reconnaissance Specia
         }
         
     except Exception as e:
-        logger.error(f"Failed to get AI task guidance: {str(e)}")
+        logger.error("Failed to get AI task guidance: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get AI task guidance: {str(e)}"
         )
 
-@app.get("/ai-guidance/analysis/{target}")
-async def get_ai_analysis(target: str):
-    """Get AI analysis of current penetration testing state"""
+@app.get("/ai-guidance/analysis/{target}", dependencies=[Depends(wait_for_model)])
+async def get_ai_analysis(response: Response, target: str, session_id: Optional[str] = None,
+                          pentest_crew: PentestCrew = Depends(get_crew)):
+    """Get AI analysis of one session's penetration testing state"""
     try:
-        pentest_crew = PentestCrew()
-        
         # Get current state analysis
-        current_state = pentest_crew.task_planner.analyze_current_state(target)
+        current_state, hit = await run_in_threadpool(
+            _analysis_cache.get_or_compute,
+            (session_id, target),
+            lambda: pentest_crew.new_task_planner(session_id).analyze_current_state(target)
+        )
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
         
         return {
             "target": target,
@@ -450,33 +845,40 @@ async def get_ai_analysis(target: str):
         }
         
     except Exception as e:
-        logger.error(f"Failed to get AI analysis: {str(e)}")
+        logger.error("Failed to get AI analysis: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get AI analysis: {str(e)}"
         )
 
-@app.post("/ai-guided-phase")
-async def execute_ai_guided_phase(request: dict):
+@app.post("/ai-guidance/cache/clear")
+async def clear_ai_guidance_cache():
+    """Invalidate cached AI task decisions and state analyses"""
+    return {
+        "status": "cleared",
+        "next_task_entries": _next_task_cache.clear(),
+        "analysis_entries": _analysis_cache.clear()
+    }
+
+@app.post("/ai-guided-phase", dependencies=[Depends(wait_for_model), Depends(heavy_slot)])
+@rate_limit
+async def execute_ai_guided_phase(request: Request, phase_request: AIPhaseRequest, pentest_crew: PentestCrew = Depends(get_crew)):
     """Execute a single AI-guided penetration testing phase"""
     try:
-        target = request.get("target")
-        agent_role = request.get("agent_role", "Reconnaissance Specialist")
-        phase_name = request.get("phase_name", "reconnaissance")
-        
-        if not target:
-            raise HTTPException(status_code=400, detail="Target is required")
+        target = phase_request.target
+        agent_role = phase_request.agent_role
+        phase_name = phase_request.phase_name
+        # Continue the caller's session, or start one; the crew itself is shared by every client
+        session_id = phase_request.session_id or str(uuid.uuid4())
         
-        logger.info(f"Starting AI-guided {phase_name} phase for target: {target}")
-        
-        pentest_crew = PentestCrew()
+        logger.info("Starting AI-guided %s phase for target: %s", phase_name, target)
         
         # Execute AI-guided phase
         phase_results = await pentest_crew.execute_ai_guided_phase(
             target=target,
             agent_role=agent_role,
             phase_name=phase_name,
-            session_id=pentest_crew.session_id
+            session_id=session_id
         )
         
         return {
@@ -485,73 +887,26 @@ async def execute_ai_guided_phase(request: dict):
             "phase": phase_name,
             "agent": agent_role,
             "results": phase_results,
-            "session_id": pentest_crew.session_id
+            "session_id": session_id
         }
         
     except Exception as e:
-        logger.error(f"AI-guided phase execution failed: {str(e)}")
+        logger.error("AI-guided phase execution failed: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"AI-guided phase execution failed: {str(e)}"
         )
 
 @app.get("/ai-agents/available")
-async def get_available_ai_agents():
+async def get_available_ai_agents(request: Request):
     """Get list of available AI agents and their capabilities"""
-    try:
-        return {
-            "agents": [
-                {
-                    "role": "Reconnaissance Specialist",
-                    "description": "Gathers comprehensive information about target systems using tools like nmap, enum4linux, and nikto",
-                    "capabilities": ["network_scanning", "service_identification", "information_gathering"],
-                    "primary_tools": ["nmap", "nikto", "enum4linux"]
-                },
-                {
-                    "role": "Vulnerability Assessment Expert", 
-                    "description": "Identifies and analyzes security vulnerabilities using specialized tools",
-                    "capabilities": ["vulnerability_scanning", "web_app_testing", "risk_assessment"],
-                    "primary_tools": ["sqlmap", "zap", "burp", "nikto"]
-                },
-                {
-                    "role": "Exploitation Specialist",
-                    "description": "Safely demonstrates and validates identified vulnerabilities",
-                    "capabilities": ["exploitation", "privilege_escalation", "proof_of_concept"],
-                    "primary_tools": ["metasploit", "hydra", "john"]
-                },
-                {
-                    "role": "Security Report Analyst",
-                    "description": "Generates comprehensive and actionable security reports",
-                    "capabilities": ["report_generation", "risk_analysis", "recommendations"],
-                    "primary_tools": ["analysis", "reporting", "documentation"]
-                }
-            ],
-            "ai_guidance_enabled": True,
-            "model_backend": "ollama_deepseek"
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get AI agents info: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to get AI agents info: {str(e)}"
-        )
+    return static_json(request, _AI_AGENTS_JSON, _AI_AGENTS_ETAG)
 
 @app.get("/sessions/recent")
-async def get_recent_sessions(limit: int = 10):
+async def get_recent_sessions(limit: int = 10, pentest_crew: PentestCrew = Depends(get_crew)):
     """Get recent penetration testing sessions"""
     try:
-        pentest_crew = PentestCrew()
-        # Get recent pentest results to extract session IDs
-        db_stats = pentest_crew.get_database_stats()
-        recent_results = db_stats.get('recent_results', [])
-        
-        sessions = []
-        for result in recent_results[:limit]:
-            session_id = result.get('session_id')
-            if session_id:
-                summary = pentest_crew.get_session_summary(session_id)
-                sessions.append(summary)
+        sessions = await pentest_crew.get_recent_session_summaries_async(limit)
         
         return {
             "recent_sessions": sessions,
@@ -564,10 +919,14 @@ async def get_recent_sessions(limit: int = 10):
         )
 
 if __name__ == "__main__":
+    is_production = azure_config.is_production()
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True,
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")) if is_production else 1,
+        reload=not is_production,
         log_level="info"
     )
@@ -1,17 +1,35 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, HttpUrl, field_validator
 from typing import Dict, Any, Optional, List
 import asyncio
+import functools
 import logging
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from anyio import to_thread
 from datetime import datetime
 import uuid
+import httpx
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 # Import our CrewAI agents and tools
 from agents.pentest_crew import PentestCrew
 from tools import ToolManager
-from models.ollama_manager import OllamaManager
+from models.ollama_manager import OllamaManager, create_http_client
+import task_queue
+from push_notifications import check_webhook_url, status_event, send_push_notification_async
+from cache_utils import TimedLRUCache
+from report_utils import summarize_pentest_results
+from compression import StreamAwareGZipMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,15 +38,93 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI-Guided Penetration Testing API",
     description="CrewAI-powered penetration testing with intelligent task sequencing",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse  # encodes datetimes natively, so payloads skip isoformat()
 )
 
+# Compress large results payloads; the progress stream is passed through untouched
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Global instances
 pentest_crew = None
 tool_manager = None
 ollama_manager = None
 
+# Blocking tool runs (nmap, nikto, ...) go here so they neither stall the event loop
+# nor spawn unbounded threads
+TOOL_POOL_SIZE = int(os.getenv("TOOL_POOL", "8"))
+tool_executor: Optional[ThreadPoolExecutor] = None
+
+# MongoDB health is refreshed in the background; /health only reads the latest snapshot
+MONGO_HEALTH_INTERVAL = float(os.getenv("MONGO_HEALTH_INTERVAL", "5"))
+
+async def mongo_health_refresher():
+    """Periodically snapshot MongoDB connectivity and stats into app.state.mongo_health"""
+    while True:
+        try:
+            stats = await pentest_crew.get_database_stats_async()
+            app.state.mongo_health = {
+                "status": "healthy",
+                "mongodb_connected": pentest_crew.mongodb.is_connected(),
+                "database_stats": stats,
+                "checked_at": datetime.utcnow()
+            }
+        except Exception as e:
+            app.state.mongo_health = {
+                "status": "error",
+                "error": str(e),
+                "checked_at": datetime.utcnow()
+            }
+        await asyncio.sleep(MONGO_HEALTH_INTERVAL)
+
+# CPU-bound report generation runs in separate processes so it doesn't hold the GIL;
+# spawn keeps the children from inheriting the server's threads and sockets
+REPORT_POOL_SIZE = int(os.getenv("REPORT_POOL", os.cpu_count() or 1))
+report_executor: Optional[ProcessPoolExecutor] = None
+
+# Cap on anyio's worker threads (sync endpoints, run_in_threadpool, to_thread)
+THREAD_LIMIT = int(os.getenv("THREAD_LIMIT", "32"))
+
+# Persistent clients for webhook deliveries and Ollama API calls
+webhook_client: Optional[httpx.AsyncClient] = None
+ollama_http: Optional[httpx.AsyncClient] = None
+
+# AI task decisions are an LLM round-trip; reuse them per (session, target, agent_role) for a while
+DECISION_CACHE_TTL = float(os.getenv("DECISION_CACHE_TTL", "300"))
+_decision_cache = TimedLRUCache(ttl=DECISION_CACHE_TTL, maxsize=1024)
+
+# Status polls for the same session within this window share one MongoDB summary query
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "2"))
+_summary_cache = TimedLRUCache(ttl=SUMMARY_CACHE_TTL, maxsize=4096)
+
+async def decide_next_task(target: str, agent_role: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Cached, single-flight wrapper around a session's TaskPlanner.decide_next_task"""
+    # Decisions depend on the session's tool history, so sessions never share them
+    decision, _ = await _decision_cache.get_or_compute_async(
+        (session_id, target, agent_role),
+        lambda: asyncio.to_thread(pentest_crew.new_task_planner(session_id).decide_next_task, target, agent_role)
+    )
+    return decision
+
+async def run_tool(tool_name: str, target: str, **params: Any) -> Any:
+    """Run pentest_crew.execute_tool on the bounded tool pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        tool_executor, functools.partial(pentest_crew.execute_tool, tool_name, target, **params)
+    )
+
 # Pydantic models for API requests
+class PushNotificationConfig(BaseModel):
+    url: HttpUrl
+    token: Optional[str] = None
+    
+    @field_validator("url")
+    @classmethod
+    def _reject_internal_hosts(cls, url: HttpUrl) -> HttpUrl:
+        # Literal addresses and localhost only; hostnames are resolved and checked before each send
+        check_webhook_url(str(url), resolve=False)
+        return url
+
 class PentestRequest(BaseModel):
     target: str
     scope: str = "basic"
@@ -36,6 +132,7 @@ class PentestRequest(BaseModel):
     specific_tools: Optional[List[str]] = None
     ai_guided: bool = True
     max_duration_minutes: int = 30
+    push_notification: Optional[PushNotificationConfig] = None  # webhook called when the session finishes
 
 class ToolExecutionRequest(BaseModel):
     tool_name: str
@@ -48,35 +145,161 @@ class AgentTaskRequest(BaseModel):
     task_description: str
     expected_outcome: str
 
-# Store active pentest sessions
-active_sessions = {}
+# Pentest sessions live in Redis (shared across workers, expiring after SESSION_TTL)
+# when REDIS_URL is set; otherwise they fall back to this process-local dict
+REDIS_URL = os.getenv("REDIS_URL")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))
+session_redis = None
+active_sessions: Dict[str, Dict[str, Any]] = {}
+
+async def get_session(session_id: str) -> Optional[Dict[str, Any]]:
+    """Load a session by ID, or None if it is unknown or expired"""
+    if session_redis is None:
+        # Copy so callers can decorate the result without mutating the store, as with Redis
+        session = active_sessions.get(session_id)
+        return dict(session) if session is not None else None
+    raw = await session_redis.get(f"session:{session_id}")
+    return orjson.loads(raw) if raw else None
+
+async def set_session(session_id: str, data: Dict[str, Any], ttl: int = SESSION_TTL):
+    """Store a session, resetting its expiry"""
+    if session_redis is None:
+        active_sessions[session_id] = data
+        return
+    await session_redis.set(f"session:{session_id}", orjson.dumps(data), ex=ttl)
+
+async def update_session(session_id: str, **fields: Any):
+    """Merge fields into a stored session"""
+    data = await get_session(session_id) or {}
+    data.update(fields)
+    await set_session(session_id, data)
+
+# Live progress: Redis pub/sub when the shared store is configured, else in-process queues
+PROGRESS_KEEPALIVE = float(os.getenv("PROGRESS_KEEPALIVE", "15"))
+_progress_queues: Dict[str, List[asyncio.Queue]] = {}
+
+def progress_channel(session_id: str) -> str:
+    return f"session:{session_id}:progress"
+
+async def publish_progress(session_id: str, event: str, data: Dict[str, Any]):
+    """Fan a progress/status event out to everyone streaming this session"""
+    message = {"event": event, "data": data}
+    if session_redis is not None:
+        await session_redis.publish(progress_channel(session_id), orjson.dumps(message))
+        return
+    for queue in _progress_queues.get(session_id, []):
+        queue.put_nowait(message)
+
+class ProgressSubscription:
+    """Receives progress events for one session while the context is open"""
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self._pubsub = None
+        self._queue: Optional[asyncio.Queue] = None
+    
+    async def __aenter__(self):
+        if session_redis is not None:
+            self._pubsub = session_redis.pubsub()
+            await self._pubsub.subscribe(progress_channel(self.session_id))
+        else:
+            self._queue = asyncio.Queue()
+            _progress_queues.setdefault(self.session_id, []).append(self._queue)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.close()
+        else:
+            queues = _progress_queues.get(self.session_id, [])
+            queues.remove(self._queue)
+            if not queues:
+                _progress_queues.pop(self.session_id, None)
+    
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within timeout"""
+        if self._pubsub is not None:
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+            return orjson.loads(message["data"]) if message else None
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+async def count_sessions() -> int:
+    """Count stored sessions"""
+    if session_redis is None:
+        return len(active_sessions)
+    count = 0
+    async for _ in session_redis.scan_iter(match="session:*", count=500):
+        count += 1
+    return count
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global pentest_crew, tool_manager, ollama_manager
+    global pentest_crew, tool_manager, ollama_manager, session_redis, tool_executor, webhook_client, ollama_http
+    global report_executor
     
     try:
         logger.info("Initializing AI-Guided Penetration Testing API...")
         
+        to_thread.current_default_thread_limiter().total_tokens = THREAD_LIMIT
+        tool_executor = ThreadPoolExecutor(max_workers=TOOL_POOL_SIZE, thread_name_prefix="tool")
+        report_executor = ProcessPoolExecutor(
+            max_workers=REPORT_POOL_SIZE, mp_context=multiprocessing.get_context("spawn")
+        )
+        webhook_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=10))
+        
+        # Shared session store so every worker sees the same sessions
+        if REDIS_AVAILABLE and REDIS_URL:
+            session_redis = aioredis.from_url(REDIS_URL)
+            logger.info("Session store: Redis")
+        else:
+            logger.info("Session store: in-process (set REDIS_URL to share sessions across workers)")
+        
         # Initialize tool manager
         tool_manager = ToolManager()
         logger.info(f"Tool Manager initialized with tools: {tool_manager.get_available_tools()}")
         
         # Initialize Ollama manager
-        ollama_manager = OllamaManager()
+        ollama_http = create_http_client()
+        ollama_manager = OllamaManager(http_client=ollama_http)
         logger.info("Ollama Manager initialized")
         
         # Initialize CrewAI agents
         pentest_crew = PentestCrew()
         logger.info("CrewAI PentestCrew initialized with AI-guided task planning")
         
+        app.state.mongo_health = {"status": "pending"}
+        app.state.mongo_health_task = asyncio.create_task(mongo_health_refresher())
+        
         logger.info("API startup complete - CrewAI agents ready for intelligent penetration testing")
         
     except Exception as e:
         logger.error(f"Error during startup: {e}")
         # Don't fail startup, allow basic functionality
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the tool pool, session store and HTTP clients on shutdown"""
+    health_task = getattr(app.state, "mongo_health_task", None)
+    if health_task is not None:
+        health_task.cancel()
+    if tool_executor is not None:
+        tool_executor.shutdown(wait=False, cancel_futures=True)
+    if report_executor is not None:
+        report_executor.shutdown(wait=False, cancel_futures=True)
+    if session_redis is not None:
+        await session_redis.close()
+    if webhook_client is not None:
+        await webhook_client.aclose()
+    if pentest_crew is not None:
+        await pentest_crew.aclose()
+    if ollama_http is not None:
+        await ollama_http.aclose()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -100,7 +323,7 @@ async def health_check():
     
     health_status = {
         "api": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
         "services": {}
     }
     
@@ -118,7 +341,7 @@ async def health_check():
     # Check Ollama manager
     if ollama_manager:
         try:
-            models = await ollama_manager.list_models()
+            models = await ollama_manager.list_models_cached()
             health_status["services"]["ollama"] = {
                 "status": "healthy",
                 "available_models": models,
@@ -134,24 +357,15 @@ async def health_check():
     
     # Check CrewAI agents
     if pentest_crew:
-        try:
-            stats = pentest_crew.get_database_stats()
-            health_status["services"]["crewai_agents"] = {
-                "status": "healthy",
-                "mongodb_connected": pentest_crew.mongodb.is_connected(),
-                "session_id": pentest_crew.session_id,
-                "database_stats": stats
-            }
-        except Exception as e:
-            health_status["services"]["crewai_agents"] = {
-                "status": "error",
-                "error": str(e)
-            }
+        health_status["services"]["crewai_agents"] = {
+            **app.state.mongo_health,
+            "session_id": pentest_crew.session_id
+        }
     else:
         health_status["services"]["crewai_agents"] = {"status": "not_initialized"}
     
     # Check active sessions
-    health_status["active_sessions"] = len(active_sessions)
+    health_status["active_sessions"] = await count_sessions()
     
     return health_status
 
@@ -172,25 +386,41 @@ async def invoke_ai_guided_pentest(request: PentestRequest, background_tasks: Ba
         logger.info(f"Starting AI-guided pentest for target: {request.target}")
         
         # Store session info
-        active_sessions[session_id] = {
+        await set_session(session_id, {
             "target": request.target,
             "status": "running",
-            "started_at": datetime.utcnow().isoformat(),
+            "started_at": datetime.utcnow(),
             "test_type": request.test_type,
             "ai_guided": request.ai_guided
-        }
+        })
         
         if request.ai_guided:
             # Execute full AI-guided penetration testing
             if request.test_type == "comprehensive":
-                # Run comprehensive AI-guided pentest in background
-                background_tasks.add_task(
-                    execute_comprehensive_ai_pentest,
-                    session_id,
-                    request.target,
-                    request.scope,
-                    request.max_duration_minutes
-                )
+                # Kept out of the session record so the token is never echoed by the status endpoints
+                push_config = request.push_notification.model_dump(mode="json") if request.push_notification else None
+                
+                # Workers write progress into the shared Redis session, so queue only when both exist;
+                # otherwise fall back to an in-process background task
+                if task_queue.is_enabled() and session_redis is not None:
+                    # The broker publish is a blocking Redis round-trip; keep it off the event loop
+                    await run_in_threadpool(
+                        task_queue.enqueue_comprehensive_pentest,
+                        session_id,
+                        request.target,
+                        request.scope,
+                        request.max_duration_minutes,
+                        push_config
+                    )
+                else:
+                    background_tasks.add_task(
+                        execute_comprehensive_ai_pentest,
+                        session_id,
+                        request.target,
+                        request.scope,
+                        request.max_duration_minutes,
+                        push_config
+                    )
                 
                 return {
                     "message": "AI-guided comprehensive penetration test started",
@@ -200,60 +430,73 @@ async def invoke_ai_guided_pentest(request: PentestRequest, background_tasks: Ba
                     "status": "running",
                     "ai_guidance": "Agents will dynamically select and sequence tasks based on AI analysis",
                     "progress_endpoint": f"/session/{session_id}/status",
+                    "stream_endpoint": f"/session/{session_id}/stream",
                     "results_endpoint": f"/session/{session_id}/results"
                 }
             
             elif request.test_type == "quick":
                 # Execute quick AI-guided scan
                 results = await execute_quick_ai_pentest(session_id, request.target, request.scope)
-                active_sessions[session_id]["status"] = "completed"
+                await update_session(session_id, status="completed")
                 return results
                 
         else:
             # Execute specific tools if provided
             if request.specific_tools:
                 results = await execute_specific_tools(session_id, request.target, request.specific_tools)
-                active_sessions[session_id]["status"] = "completed"
+                await update_session(session_id, status="completed")
                 return results
         
         # Default to quick AI-guided test
         results = await execute_quick_ai_pentest(session_id, request.target, request.scope)
-        active_sessions[session_id]["status"] = "completed"
+        await update_session(session_id, status="completed")
         return results
         
     except Exception as e:
         logger.error(f"Error in AI-guided pentest: {e}")
-        if session_id in active_sessions:
-            active_sessions[session_id]["status"] = "error"
-            active_sessions[session_id]["error"] = str(e)
+        if await get_session(session_id) is not None:
+            await update_session(session_id, status="error", error=str(e))
         raise HTTPException(status_code=500, detail=f"Pentest execution failed: {str(e)}")
 
-async def execute_comprehensive_ai_pentest(session_id: str, target: str, scope: str, max_duration: int):
-    """Execute comprehensive AI-guided penetration testing"""
+async def execute_comprehensive_ai_pentest(session_id: str, target: str, scope: str, max_duration: int,
+                                           push_config: Optional[Dict[str, Any]] = None):
+    """Execute comprehensive AI-guided penetration testing, notifying push_config's webhook when done"""
     global pentest_crew
     
     try:
         # Update session status
-        active_sessions[session_id]["status"] = "running_comprehensive"
+        await update_session(session_id, status="running_comprehensive")
+        await publish_progress(session_id, "status", status_event(session_id, "running_comprehensive", target=target))
         
         # Execute full CrewAI-guided penetration test
         results = await pentest_crew.execute_pentest(
             target=target,
             scope=scope,
-            additional_params={"max_duration_minutes": max_duration, "session_id": session_id}
+            additional_params={"max_duration_minutes": max_duration, "session_id": session_id},
+            on_progress=lambda event: publish_progress(session_id, "progress", event)
         )
         
         # Store results
-        active_sessions[session_id]["status"] = "completed"
-        active_sessions[session_id]["results"] = results
-        active_sessions[session_id]["completed_at"] = datetime.utcnow().isoformat()
+        await update_session(session_id, status="completed", results=results,
+                             completed_at=datetime.utcnow())
+        await publish_progress(session_id, "status", status_event(session_id, "completed", target=target))
         
         logger.info(f"Comprehensive AI-guided pentest completed for session {session_id}")
         
+        if push_config:
+            await send_push_notification_async(
+                webhook_client, push_config, status_event(session_id, "completed", target=target)
+            )
+        
     except Exception as e:
         logger.error(f"Error in comprehensive pentest {session_id}: {e}")
-        active_sessions[session_id]["status"] = "error"
-        active_sessions[session_id]["error"] = str(e)
+        await update_session(session_id, status="error", error=str(e))
+        await publish_progress(session_id, "status", status_event(session_id, "error", target=target, error=str(e)))
+        
+        if push_config:
+            await send_push_notification_async(
+                webhook_client, push_config, status_event(session_id, "error", target=target, error=str(e))
+            )
 
 async def execute_quick_ai_pentest(session_id: str, target: str, scope: str) -> Dict[str, Any]:
     """Execute quick AI-guided penetration testing (2-3 tools max)"""
@@ -276,7 +519,7 @@ async def execute_quick_ai_pentest(session_id: str, target: str, scope: str) ->
         results["phases"]["reconnaissance"] = recon_results
         
         # Based on reconnaissance, let AI decide if vulnerability assessment is needed
-        decision = pentest_crew.task_planner.decide_next_task(target, "Vulnerability Assessment Expert")
+        decision = await decide_next_task(target, "Vulnerability Assessment Expert", session_id)
         
         if decision.get("priority") in ["high", "medium"]:
             logger.info(f"AI recommends vulnerability assessment: {decision.get('reasoning')}")
@@ -286,9 +529,11 @@ async def execute_quick_ai_pentest(session_id: str, target: str, scope: str) ->
             results["phases"]["vulnerability_assessment"] = vuln_results
         
         # Generate quick summary
-        results["summary"] = pentest_crew.generate_pentest_summary(results, session_id)
+        results["summary"] = await asyncio.get_running_loop().run_in_executor(
+            report_executor, summarize_pentest_results, results
+        )
         results["ai_guidance_used"] = True
-        results["completed_at"] = datetime.utcnow().isoformat()
+        results["completed_at"] = datetime.utcnow()
         
         return results
         
@@ -308,29 +553,32 @@ async def execute_specific_tools(session_id: str, target: str, tools: List[str])
         "summary": {}
     }
     
-    for tool_name in tools:
+    async def run_one(tool_name: str) -> Dict[str, Any]:
         try:
             logger.info(f"Executing specific tool: {tool_name} on target: {target}")
-            result = pentest_crew.execute_tool(tool_name, target)
-            results["tool_results"].append({
+            result = await run_tool(tool_name, target, session_id=session_id)
+            return {
                 "tool": tool_name,
                 "target": target,
                 "output": result,
-                "executed_at": datetime.utcnow().isoformat()
-            })
+                "executed_at": datetime.utcnow()
+            }
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {e}")
-            results["tool_results"].append({
+            return {
                 "tool": tool_name,
                 "target": target,
                 "error": str(e),
-                "executed_at": datetime.utcnow().isoformat()
-            })
+                "executed_at": datetime.utcnow()
+            }
+    
+    # Tools are independent, so run them side by side on the pool
+    results["tool_results"] = list(await asyncio.gather(*(run_one(t) for t in tools)))
     
     results["summary"] = {
         "tools_executed": len(tools),
         "successful_executions": len([r for r in results["tool_results"] if "error" not in r]),
-        "completed_at": datetime.utcnow().isoformat()
+        "completed_at": datetime.utcnow()
     }
     
     return results
@@ -345,14 +593,14 @@ async def execute_single_tool(request: ToolExecutionRequest):
     
     try:
         logger.info(f"Executing tool: {request.tool_name} on target: {request.target}")
-        result = pentest_crew.execute_tool(request.tool_name, request.target, **request.parameters)
+        result = await run_tool(request.tool_name, request.target, **request.parameters)
         
         return {
             "tool": request.tool_name,
             "target": request.target,
             "parameters": request.parameters,
             "result": result,
-            "executed_at": datetime.utcnow().isoformat(),
+            "executed_at": datetime.utcnow(),
             "success": True
         }
         
@@ -361,7 +609,7 @@ async def execute_single_tool(request: ToolExecutionRequest):
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
 @app.post("/ai-task-decision")
-async def get_ai_task_decision(target: str, agent_role: str):
+async def get_ai_task_decision(target: str, agent_role: str, session_id: Optional[str] = None):
     """Get AI-guided task decision for a specific agent and target"""
     global pentest_crew
     
@@ -369,13 +617,13 @@ async def get_ai_task_decision(target: str, agent_role: str):
         raise HTTPException(status_code=503, detail="PentestCrew not initialized")
     
     try:
-        decision = pentest_crew.task_planner.decide_next_task(target, agent_role)
+        decision = await decide_next_task(target, agent_role, session_id)
         
         return {
             "target": target,
             "agent_role": agent_role,
             "ai_decision": decision,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
         
     except Exception as e:
@@ -385,29 +633,59 @@ async def get_ai_task_decision(target: str, agent_role: str):
 @app.get("/session/{session_id}/status")
 async def get_session_status(session_id: str):
     """Get the status of a specific pentest session"""
-    if session_id not in active_sessions:
+    session_info = await get_session(session_id)
+    if session_info is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session_info = active_sessions[session_id].copy()
-    
     # Add additional info from MongoDB if available
     if pentest_crew:
         try:
-            session_summary = pentest_crew.get_session_summary(session_id)
+            session_summary, _ = await _summary_cache.get_or_compute_async(
+                session_id, lambda: pentest_crew.get_session_summary_async(session_id)
+            )
             session_info["database_summary"] = session_summary
         except Exception as e:
             session_info["database_error"] = str(e)
     
     return session_info
 
+@app.get("/session/{session_id}/stream")
+async def stream_session_progress(session_id: str):
+    """Stream phase progress and status changes of a session as Server-Sent Events"""
+    if await get_session(session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    def sse(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+    
+    async def events():
+        async with ProgressSubscription(session_id) as subscription:
+            # Read the state only after subscribing so a transition can't slip in between
+            session = await get_session(session_id) or {}
+            state = session.get("status", "unknown")
+            yield sse("status", status_event(session_id, state, target=session.get("target")))
+            if state in ("completed", "error"):
+                return
+            
+            while True:
+                message = await subscription.get(PROGRESS_KEEPALIVE)
+                if message is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse(message["event"], message["data"])
+                if message["data"].get("final"):
+                    return
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.get("/session/{session_id}/results")
 async def get_session_results(session_id: str):
     """Get the detailed results of a specific pentest session"""
-    if session_id not in active_sessions:
+    session_info = await get_session(session_id)
+    if session_info is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session_info = active_sessions[session_id]
-    
     if session_info["status"] == "completed" and "results" in session_info:
         return session_info["results"]
     elif session_info["status"] == "error":
@@ -428,7 +706,7 @@ async def list_available_tools():
     return {
         "available_tools": available_tools,
         "tool_count": len(available_tools),
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     }
 
 @app.get("/agents/status")
@@ -450,7 +728,7 @@ async def get_agents_status():
         "ai_guidance_enabled": True,
         "mongodb_connected": pentest_crew.mongodb.is_connected(),
         "task_planner": "Active",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     }
 
 @app.get("/database/stats")
@@ -462,7 +740,7 @@ async def get_database_statistics():
         raise HTTPException(status_code=503, detail="CrewAI agents not initialized")
     
     try:
-        stats = pentest_crew.get_database_stats()
+        stats = await pentest_crew.get_database_stats_async()
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -476,11 +754,11 @@ async def get_recent_results(limit: int = 10):
         raise HTTPException(status_code=503, detail="CrewAI agents not initialized")
     
     try:
-        results = pentest_crew.get_recent_pentest_results(limit=limit)
+        results = await pentest_crew.get_recent_pentest_results_async(limit=limit)
         return {
             "results": results,
             "count": len(results),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -494,7 +772,7 @@ async def get_agent_actions(agent_role: Optional[str] = None, session_id: Option
         raise HTTPException(status_code=503, detail="CrewAI agents not initialized")
     
     try:
-        actions = pentest_crew.get_agent_actions(agent_role=agent_role, session_id=session_id, limit=limit)
+        actions = await pentest_crew.get_agent_actions_async(agent_role=agent_role, session_id=session_id, limit=limit)
         return {
             "actions": actions,
             "count": len(actions),
@@ -502,11 +780,49 @@ async def get_agent_actions(agent_role: Optional[str] = None, session_id: Option
                 "agent_role": agent_role,
                 "session_id": session_id
             },
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.utcnow()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.get("/dashboard")
+async def get_dashboard(limit: int = 10, action_limit: int = 50, agent_role: Optional[str] = None, session_id: Optional[str] = None):
+    """Get recent pentest results and agent actions in a single MongoDB round-trip"""
+    global pentest_crew
+    
+    if not pentest_crew:
+        raise HTTPException(status_code=503, detail="CrewAI agents not initialized")
+    
+    try:
+        dashboard = await pentest_crew.get_dashboard_async(
+            limit=limit, action_limit=action_limit, agent_role=agent_role, session_id=session_id
+        )
+        return {
+            **dashboard,
+            "counts": {
+                "recent_results": len(dashboard["recent_results"]),
+                "agent_actions": len(dashboard["agent_actions"])
+            },
+            "filters": {
+                "agent_role": agent_role,
+                "session_id": session_id
+            },
+            "timestamp": datetime.utcnow()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Without Redis each worker would hold its own sessions, so only fan out when it is configured
+    default_workers = (os.cpu_count() or 1) if REDIS_AVAILABLE and REDIS_URL else 1
+    uvicorn.run(
+        "main_crewai:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", default_workers)),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
@@ -1,15 +1,25 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import asyncio
 import uvicorn
+from anyio import to_thread
 import os
-from models.ollama_manager import OllamaManager
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from models.ollama_manager import OllamaManager, create_http_client
+from compression import StreamAwareGZipMiddleware
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import logging
 import subprocess
+import time
+import hashlib
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,7 +30,8 @@ app = FastAPI(
     description="An intelligent platform for automated penetration testing and security assessment",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -32,6 +43,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large scan results; added after CORS so it wraps it
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Pydantic models
 class ScanRequest(BaseModel):
     target: str
@@ -43,6 +57,10 @@ class TaskRequest(BaseModel):
     target: str
     parameters: Dict[str, Any] = {}
 
+class ChatRequest(BaseModel):
+    model: str = "llama3.2:latest"
+    message: str = Field(min_length=1)
+
 class ScanResult(BaseModel):
     scan_id: str
     target: str
@@ -50,8 +68,26 @@ class ScanResult(BaseModel):
     results: Dict[str, Any]
     timestamp: str
 
-# Initialize managers
-ollama_manager = OllamaManager()
+# Initialize managers; one pooled client serves every Ollama call in this process
+ollama_http = create_http_client()
+ollama_manager = OllamaManager(http_client=ollama_http)
+
+# Cap on anyio's worker threads used for sync endpoints and threadpool offloads
+THREAD_LIMIT = int(os.getenv("THREAD_LIMIT", "32"))
+
+@app.on_event("startup")
+async def startup_event():
+    """Bound the default threadpool"""
+    to_thread.current_default_thread_limiter().total_tokens = THREAD_LIMIT
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared Ollama client"""
+    await ollama_http.aclose()
+
+# Tool probes shell out, so remember each answer for a while: {tool: (available, expires_at)}
+TOOL_CHECK_TTL = float(os.getenv("TOOL_CHECK_TTL", "60"))
+_tool_availability_cache: Dict[str, tuple] = {}
 
 # Health check endpoint
 @app.get("/health")
@@ -59,31 +95,25 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Check if essential tools are available
-        tools_status = {
-            "nmap": check_tool_availability("nmap"),
-            "nikto": check_tool_availability("nikto"),
-            "sqlmap": check_tool_availability("sqlmap"),
-            "hydra": check_tool_availability("hydra")
-        }
+        essential_tools = ("nmap", "nikto", "sqlmap", "hydra")
+        availability = await asyncio.gather(*(check_tool_availability(t) for t in essential_tools))
+        tools_status = dict(zip(essential_tools, availability))
         
         # Check Ollama connection
         ollama_status = await ollama_manager.health_check()
         
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "healthy",
-                "version": "1.0.0",
-                "services": {
-                    "ollama": ollama_status,
-                    "tools": tools_status
-                },
-                "message": "AI-Guided Penetration Testing Platform is running"
-            }
-        )
+        return {
+            "status": "healthy",
+            "version": "1.0.0",
+            "services": {
+                "ollama": ollama_status,
+                "tools": tools_status
+            },
+            "message": "AI-Guided Penetration Testing Platform is running"
+        }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -92,22 +122,37 @@ async def health_check():
             }
         )
 
-def check_tool_availability(tool_name: str) -> bool:
-    """Check if a penetration testing tool is available"""
+async def _probe_tool(tool_name: str, flag: str) -> bool:
+    """Run `tool flag` without blocking the event loop and report whether it exited cleanly"""
+    proc = await asyncio.create_subprocess_exec(
+        tool_name, flag,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL
+    )
     try:
-        result = subprocess.run([tool_name, "--version"], 
-                              capture_output=True, 
-                              timeout=5)
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return await asyncio.wait_for(proc.wait(), timeout=5) == 0
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+async def check_tool_availability(tool_name: str) -> bool:
+    """Check if a penetration testing tool is available, caching the answer for TOOL_CHECK_TTL seconds"""
+    cached = _tool_availability_cache.get(tool_name)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+    
+    try:
+        available = await _probe_tool(tool_name, "--version")
+    except (asyncio.TimeoutError, FileNotFoundError):
         try:
             # Try alternative version check
-            result = subprocess.run([tool_name, "-h"], 
-                                  capture_output=True, 
-                                  timeout=5)
-            return result.returncode == 0
-        except:
-            return False
+            available = await _probe_tool(tool_name, "-h")
+        except Exception:
+            available = False
+    
+    _tool_availability_cache[tool_name] = (available, time.monotonic() + TOOL_CHECK_TTL)
+    return available
 
 @app.get("/")
 async def root():
@@ -132,12 +177,64 @@ async def list_tools():
         {"name": "smbclient", "description": "SMB/CIFS client"}
     ]
     
-    # Check availability of each tool
-    for tool in tools:
-        tool["available"] = check_tool_availability(tool["name"])
+    # Check availability of all tools concurrently
+    availability = await asyncio.gather(*(check_tool_availability(tool["name"]) for tool in tools))
+    for tool, available in zip(tools, availability):
+        tool["available"] = available
     
     return {"tools": tools}
 
+def make_scan_id(tool: str, target: str) -> str:
+    """Stable scan ID for a tool/target pair, identical across worker processes"""
+    if XXHASH_AVAILABLE:
+        digest = xxhash.xxh3_64_hexdigest(target)
+    else:
+        digest = hashlib.blake2b(target.encode(), digest_size=8).hexdigest()
+    return f"{tool}_{digest}"
+
+# nmap flags per scan type; unknown types run a default scan
+NMAP_CMDS = {
+    "basic": ("-sn",),
+    "port": ("-p", "1-1000"),
+    "service": ("-sV",),
+    "default": (),
+}
+
+def build_nmap_command(target: str, scan_type: str) -> Tuple[str, ...]:
+    """Construct nmap command based on scan type"""
+    return ("nmap", *NMAP_CMDS.get(scan_type, NMAP_CMDS["default"]), target)
+
+async def run_scan_command(cmd: Sequence[str], timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run a scanner without blocking the event loop
+    
+    Args:
+        cmd: Command and arguments
+        timeout: Seconds before the process is killed
+    
+    Returns:
+        CompletedProcess with decoded stdout/stderr
+    
+    Raises:
+        asyncio.TimeoutError: If the scan exceeds the timeout
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return subprocess.CompletedProcess(
+        cmd, proc.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace")
+    )
+
 @app.post("/api/scan/nmap")
 async def run_nmap_scan(request: ScanRequest):
     """Run an nmap scan"""
@@ -149,21 +246,13 @@ async def run_nmap_scan(request: ScanRequest):
         if not target:
             raise HTTPException(status_code=400, detail="Target is required")
         
-        # Construct nmap command based on scan type
-        if scan_type == "basic":
-            cmd = ["nmap", "-sn", target]
-        elif scan_type == "port":
-            cmd = ["nmap", "-p", "1-1000", target]
-        elif scan_type == "service":
-            cmd = ["nmap", "-sV", target]
-        else:
-            cmd = ["nmap", target]
+        cmd = build_nmap_command(target, scan_type)
         
         # Run the scan
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        result = await run_scan_command(cmd, timeout=300)
         
         return {
-            "scan_id": f"nmap_{hash(target)}",
+            "scan_id": make_scan_id("nmap", target),
             "target": target,
             "command": " ".join(cmd),
             "status": "completed" if result.returncode == 0 else "failed",
@@ -171,12 +260,47 @@ async def run_nmap_scan(request: ScanRequest):
             "error": result.stderr if result.stderr else None
         }
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=408, detail="Scan timeout")
     except Exception as e:
         logger.error(f"Nmap scan failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Scan failed: {str(e)}")
 
+@app.post("/api/scan/nmap/stream")
+async def stream_nmap_scan(request: ScanRequest):
+    """Run an nmap scan and stream its output as Server-Sent Events"""
+    if not request.target:
+        raise HTTPException(status_code=400, detail="Target is required")
+    
+    cmd = build_nmap_command(request.target, request.options.get("scan_type", "basic"))
+    
+    async def events():
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 300
+        try:
+            while True:
+                line = await asyncio.wait_for(proc.stdout.readline(), timeout=max(deadline - loop.time(), 0))
+                if not line:
+                    break
+                yield f"data: {line.decode(errors='replace').rstrip()}\n\n"
+            await asyncio.wait_for(proc.wait(), timeout=max(deadline - loop.time(), 0))
+            status = "completed" if proc.returncode == 0 else "failed"
+        except asyncio.TimeoutError:
+            status = "timeout"
+        finally:
+            # Client disconnects and timeouts must not leave nmap running
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        yield f"event: done\ndata: {status}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/api/scan/nikto")
 async def run_nikto_scan(request: ScanRequest):
     """Run a nikto web vulnerability scan"""
@@ -188,13 +312,13 @@ async def run_nikto_scan(request: ScanRequest):
             raise HTTPException(status_code=400, detail="Target is required")
         
         # Construct nikto command
-        cmd = ["nikto", "-h", target]
+        cmd = ("nikto", "-h", target)
         
         # Run the scan
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        result = await run_scan_command(cmd, timeout=600)
         
         return {
-            "scan_id": f"nikto_{hash(target)}",
+            "scan_id": make_scan_id("nikto", target),
             "target": target,
             "command": " ".join(cmd),
             "status": "completed" if result.returncode == 0 else "failed",
@@ -202,7 +326,7 @@ async def run_nikto_scan(request: ScanRequest):
             "error": result.stderr if result.stderr else None
         }
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=408, detail="Scan timeout")
     except Exception as e:
         logger.error(f"Nikto scan failed: {str(e)}")
@@ -212,22 +336,16 @@ async def run_nikto_scan(request: ScanRequest):
 async def list_ollama_models():
     """List available Ollama models"""
     try:
-        return await ollama_manager.list_models()
+        return await ollama_manager.list_models_cached()
     except Exception as e:
         logger.error(f"Failed to list Ollama models: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to list models: {str(e)}")
 
 @app.post("/api/ollama/chat")
-async def chat_with_ollama(request: dict):
+async def chat_with_ollama(request: ChatRequest):
     """Chat with Ollama AI"""
     try:
-        model = request.get("model", "llama3.2:latest")
-        message = request.get("message", "")
-        
-        if not message:
-            raise HTTPException(status_code=400, detail="Message is required")
-        
-        response = await ollama_manager.generate_response(model, message)
+        response = await ollama_manager.generate_response(request.message, model=request.model)
         return {"response": response}
         
     except Exception as e:
@@ -237,9 +355,13 @@ async def chat_with_ollama(request: dict):
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(
-        "main:app",
+        "main_simple:app",
         host="0.0.0.0",
         port=port,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
         reload=False,
-        log_level="info"
+        log_level="warning",
+        access_log=False
     )
@@ -1,129 +1,402 @@
 import ollama
+import httpx
 import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, FrozenSet, List, Optional, Tuple
 import subprocess
 import sys
 import os
+import shutil
+import socket
+import time
 
 logger = logging.getLogger(__name__)
 
+try:
+    from crewai import LLM
+    CREWAI_LLM_AVAILABLE = True
+except ImportError:
+    CREWAI_LLM_AVAILABLE = False
+
+try:
+    from langchain_community.llms import Ollama as OllamaLLM
+    LANGCHAIN_OLLAMA_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_OLLAMA_AVAILABLE = False
+
+# How long a resolved binary path is trusted before re-checking
+PROBE_CACHE_TTL = 5.0
+# How long a daemon readiness probe result is reused, and how long one may take
+READY_CACHE_TTL = 2.0
+READY_PROBE_TIMEOUT = 0.25
+# Backoff schedule and overall budget when waiting for an install or daemon start to land
+READY_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8, 1.0, 1.0, 1.0)
+READY_POLL_TIMEOUT = 15.0
+INSTALL_TIMEOUT = 600.0
+# How long a fully green ensure_model_available result is trusted
+READY_FLAG_TTL = 60.0
+# Last known-good state shared across processes, trusted (then re-checked in the background) for a day
+STATE_CACHE_PATH = os.getenv(
+    "OLLAMA_STATE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "cybrty", "ollama_state.json")
+)
+STATE_CACHE_TTL = 86400
+
+async def _run(*argv: str, timeout: float = 5.0, shell: bool = False) -> Tuple[int, str, str]:
+    """
+    Run a command without blocking the event loop
+    
+    Args:
+        *argv: Program and arguments, or a single shell command line when shell is True
+        timeout: Seconds before the process is killed and asyncio.TimeoutError raised
+        shell: Run argv[0] through the shell
+    
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+    """
+    if shell:
+        proc = await asyncio.create_subprocess_shell(argv[0], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    else:
+        proc = await asyncio.create_subprocess_exec(*argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, out.decode(errors="replace"), err.decode(errors="replace")
+
+_ollama_bin_path: Optional[str] = None
+_ollama_bin_ts = float("-inf")
+
+def _ollama_bin(fresh: bool = False) -> Optional[str]:
+    """Path of the ollama binary, shared by all managers; re-resolved at most every PROBE_CACHE_TTL seconds unless fresh"""
+    global _ollama_bin_path, _ollama_bin_ts
+    now = time.monotonic()
+    if fresh or now - _ollama_bin_ts >= PROBE_CACHE_TTL:
+        _ollama_bin_path = shutil.which('ollama')
+        _ollama_bin_ts = now
+    return _ollama_bin_path
+
+def _invalidate_ollama_bin():
+    global _ollama_bin_ts
+    _ollama_bin_ts = float("-inf")
+
+def _ollama_host() -> str:
+    host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    return host if "://" in host else f"http://{host}"
+
+def create_http_client(host: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Build a pooled async client for the Ollama REST API, meant to be created once per process
+    
+    Args:
+        host: Ollama base URL (defaults to OLLAMA_HOST or http://localhost:11434)
+    
+    Returns:
+        httpx.AsyncClient to pass as OllamaManager(http_client=...); the caller closes it
+    """
+    host = host or _ollama_host()
+    if "://" not in host:
+        host = f"http://{host}"
+    return httpx.AsyncClient(
+        base_url=host,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        timeout=httpx.Timeout(30.0, connect=2.0)
+    )
+
+_INSTALL_BANNER = "=" * 60
+
+_INSTALL_MSG_DARWIN = f"""Manual install required
+{_INSTALL_BANNER}
+MANUAL OLLAMA INSTALLATION REQUIRED
+{_INSTALL_BANNER}
+Please install Ollama manually:
+
+Option 1 - Using Homebrew:
+  brew install ollama
+
+Option 2 - Download installer:
+  https://ollama.ai/download/mac
+
+After installation, restart the API server.
+{_INSTALL_BANNER}"""
+
+_INSTALL_MSG_LINUX = f"""Manual install required
+{_INSTALL_BANNER}
+MANUAL OLLAMA INSTALLATION REQUIRED
+{_INSTALL_BANNER}
+Please install Ollama manually:
+
+Option 1 - Manual install script:
+  curl -fsSL https://ollama.ai/install.sh | sh
+
+Option 2 - Download from:
+  https://ollama.ai/download/linux
+
+After installation, restart the API server.
+{_INSTALL_BANNER}"""
+
+_INSTALL_MSG_OTHER = f"""Manual install required
+{_INSTALL_BANNER}
+MANUAL OLLAMA INSTALLATION REQUIRED
+{_INSTALL_BANNER}
+Please install Ollama manually:
+
+Download from: https://ollama.ai/download
+
+After installation, restart the API server.
+{_INSTALL_BANNER}"""
+
+_IS_DARWIN = sys.platform == "darwin"
+_IS_LINUX = sys.platform.startswith("linux")
+_INSTALL_SUPPORTED = _IS_DARWIN or _IS_LINUX
+
+if _IS_DARWIN:
+    _INSTALL_MSG = _INSTALL_MSG_DARWIN
+elif _IS_LINUX:
+    _INSTALL_MSG = _INSTALL_MSG_LINUX
+else:
+    _INSTALL_MSG = _INSTALL_MSG_OTHER
+
+class MockLLM:
+    """Stand-in LLM that echoes the prompt, used when no real model is reachable"""
+    
+    _PREFIX = "[MOCK RESPONSE] Analysis for: "
+    
+    def __init__(self):
+        self.model_name = "mock-llm"
+    
+    def __call__(self, prompt: str, **kwargs) -> str:
+        return self._PREFIX + prompt[:100] + "..."
+    
+    def invoke(self, prompt: str, **kwargs) -> str:
+        return self._PREFIX + prompt[:100] + "..."
+    
+    def predict(self, text: str, **kwargs) -> str:
+        return self._PREFIX + text[:100] + "..."
+
+_MOCK_LLM = MockLLM()
+
 class OllamaManager:
     """Manager for Ollama integration and Deepseek model management"""
     
-    def __init__(self, model_name: str = "deepseek-r1:1.5b"):
+    # LLM objects are stateless per (model, host), so every manager in the process shares them
+    _llm_cache: Dict[Tuple[str, str], Any] = {}
+    
+    # Sent as-is on every generate call; treat as read-only (json encoding needs a real dict)
+    _DEFAULT_OPTIONS: Dict[str, Any] = {
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "max_tokens": 2048
+    }
+    
+    def __init__(self, model_name: str = "deepseek-r1:1.5b", http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            model_name: Ollama model to manage
+            http_client: Shared async client pointed at the Ollama host; when given,
+                status and generate calls reuse its keep-alive pool instead of
+                ollama.AsyncClient
+        """
         self.model_name = model_name
         self.client = None
+        self.async_client = None
+        self.http = http_client
+        self._models_cache: Optional[List[str]] = None
+        self._model_names: FrozenSet[str] = frozenset()
+        self._models_cache_expires = 0.0
+        base_url = http_client.base_url if http_client is not None else httpx.URL(_ollama_host())
+        self._base_url = str(base_url).rstrip("/")
+        default_port = 443 if base_url.scheme == "https" else 80
+        self._service_addr = (base_url.host or "127.0.0.1", base_url.port or default_port)
+        self._service_ready_cache = False
+        self._service_ready_ts = float("-inf")
+        self._serve_proc: Optional[asyncio.subprocess.Process] = None
+        self._ready = False
+        self._ready_ts = float("-inf")
+        self._revalidate_task: Optional[asyncio.Task] = None
         self._initialize_client()
     
     def _initialize_client(self):
         """Initialize Ollama client"""
         try:
             self.client = ollama.Client()
+            # With a shared http_client every async call goes through it instead
+            if self.http is None:
+                self.async_client = ollama.AsyncClient()
             logger.info("Ollama client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Ollama client: {str(e)}")
             raise
     
+    async def aclose(self):
+        """Close the ollama.AsyncClient connection pool this manager created; a shared http_client is closed by its owner"""
+        client, self.async_client = self.async_client, None
+        if client is not None:
+            # ollama's AsyncClient wraps an httpx.AsyncClient and (in 0.1.x) has no close() of its own
+            await client._client.aclose()
+    
+    async def _is_installed(self) -> bool:
+        """Check for the ollama binary without installing anything"""
+        return _ollama_bin() is not None
+    
+    async def _service_ready(self, fresh: bool = False) -> bool:
+        """Check that the Ollama daemon accepts connections; cached for READY_CACHE_TTL seconds unless fresh"""
+        now = time.monotonic()
+        if not fresh and now - self._service_ready_ts < READY_CACHE_TTL:
+            return self._service_ready_cache
+        
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(*self._service_addr), READY_PROBE_TIMEOUT)
+            writer.close()
+            ready = True
+        except (OSError, asyncio.TimeoutError):
+            ready = False
+        
+        self._service_ready_cache = ready
+        self._service_ready_ts = time.monotonic()
+        return ready
+    
+    def _service_ready_sync(self) -> bool:
+        """Blocking _service_ready for sync callers; shares its cache, so it rarely connects"""
+        if time.monotonic() - self._service_ready_ts < READY_CACHE_TTL:
+            return self._service_ready_cache
+        
+        try:
+            socket.create_connection(self._service_addr, timeout=READY_PROBE_TIMEOUT).close()
+            ready = True
+        except OSError:
+            ready = False
+        
+        self._service_ready_cache = ready
+        self._service_ready_ts = time.monotonic()
+        return ready
+    
+    @staticmethod
+    async def _poll_until(check: Callable[[], Awaitable[bool]]) -> bool:
+        """Re-run check on the READY_POLL_DELAYS backoff until it passes or READY_POLL_TIMEOUT expires"""
+        async def poll():
+            for delay in READY_POLL_DELAYS:
+                if await check():
+                    return True
+                await asyncio.sleep(delay)
+            return await check()
+        
+        try:
+            return await asyncio.wait_for(poll(), READY_POLL_TIMEOUT)
+        except asyncio.TimeoutError:
+            return False
+    
+    def _watch_serve_proc(self, pid: int):
+        """Get notified the moment our 'ollama serve' child exits (Linux pidfd; no-op elsewhere)"""
+        if not hasattr(os, "pidfd_open"):
+            return
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            return  # already gone, or kernel < 5.3
+        
+        loop = asyncio.get_running_loop()
+        
+        def on_exit():
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+            logger.warning(f"⚠️ Ollama service (pid {pid}) exited")
+            self._serve_proc = None
+            self._invalidate_probes()
+            self.invalidate_ready()
+        
+        loop.add_reader(pidfd, on_exit)
+    
+    def _invalidate_probes(self):
+        """Forget cached binary/readiness lookups after an install or service start"""
+        _invalidate_ollama_bin()
+        self._service_ready_ts = float("-inf")
+    
     async def ensure_ollama_installed(self) -> bool:
         """Ensure Ollama is installed on the system"""
         try:
             # Check if ollama command is available
-            result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-            if result.returncode == 0:
-                logger.info(f"Ollama is already installed at: {result.stdout.strip()}")
+            ollama_path = _ollama_bin()
+            if ollama_path:
+                logger.info(f"Ollama is already installed at: {ollama_path}")
                 return True
             
             logger.info("Ollama not found, attempting to install...")
-            
-            # Install Ollama (macOS/Linux)
-            if sys.platform == "darwin" or sys.platform.startswith("linux"):
-                logger.info("Attempting automatic Ollama installation...")
-                install_cmd = "curl -fsSL https://ollama.ai/install.sh | sh"
-                result = subprocess.run(install_cmd, shell=True, capture_output=True, text=True)
-                
-                logger.info(f"Install command stdout: {result.stdout}")
-                if result.stderr:
-                    logger.warning(f"Install command stderr: {result.stderr}")
-                
-                if result.returncode == 0:
-                    logger.info("Ollama installation command completed successfully")
-                    
-                    # Verify installation
-                    await asyncio.sleep(2)  # Wait for installation to complete
-                    verify_result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-                    if verify_result.returncode == 0:
-                        logger.info("Ollama installed and verified successfully")
-                        return True
-                    else:
-                        logger.error("Ollama installation completed but binary not found in PATH")
-                        self._show_manual_install_instructions()
-                        return False
-                else:
-                    logger.error(f"Failed to install Ollama. Return code: {result.returncode}")
-                    logger.error(f"Stdout: {result.stdout}")
-                    logger.error(f"Stderr: {result.stderr}")
-                    self._show_manual_install_instructions()
-                    return False
-            else:
-                logger.error("Automatic Ollama installation not supported on this platform")
-                self._show_manual_install_instructions()
-                return False
+            return await self._install_impl()
                 
         except Exception as e:
             logger.error(f"Error checking/installing Ollama: {str(e)}")
             self._show_manual_install_instructions()
             return False
     
+    async def _install_darwin_linux(self) -> bool:
+        """Install Ollama with the official install script (macOS/Linux)"""
+        logger.info("Attempting automatic Ollama installation...")
+        install_cmd = "curl -fsSL https://ollama.ai/install.sh | sh"
+        returncode, stdout, stderr = await _run(install_cmd, timeout=INSTALL_TIMEOUT, shell=True)
+        
+        logger.info(f"Install command stdout: {stdout}")
+        if stderr:
+            logger.warning(f"Install command stderr: {stderr}")
+        
+        if returncode != 0:
+            logger.error(f"Failed to install Ollama. Return code: {returncode}")
+            logger.error(f"Stdout: {stdout}")
+            logger.error(f"Stderr: {stderr}")
+            self._show_manual_install_instructions()
+            return False
+        
+        logger.info("Ollama installation command completed successfully")
+        self._invalidate_probes()
+        
+        # Verify installation, returning as soon as the binary shows up on PATH
+        async def installed():
+            return _ollama_bin(fresh=True) is not None
+        if await self._poll_until(installed):
+            logger.info("Ollama installed and verified successfully")
+            return True
+        
+        logger.error("Ollama installation completed but binary not found in PATH")
+        self._show_manual_install_instructions()
+        return False
+    
+    async def _install_unsupported(self) -> bool:
+        logger.error("Automatic Ollama installation not supported on this platform")
+        self._show_manual_install_instructions()
+        return False
+    
+    # Platform is fixed for the process, so pick the installer once
+    _install_impl = _install_darwin_linux if _INSTALL_SUPPORTED else _install_unsupported
+    
     def _show_manual_install_instructions(self):
         """Show manual installation instructions"""
-        logger.info("="*60)
-        logger.info("MANUAL OLLAMA INSTALLATION REQUIRED")
-        logger.info("="*60)
-        logger.info("Please install Ollama manually:")
-        logger.info("")
-        if sys.platform == "darwin":
-            logger.info("Option 1 - Using Homebrew:")
-            logger.info("  brew install ollama")
-            logger.info("")
-            logger.info("Option 2 - Download installer:")
-            logger.info("  https://ollama.ai/download/mac")
-            logger.info("")
-        elif sys.platform.startswith("linux"):
-            logger.info("Option 1 - Manual install script:")
-            logger.info("  curl -fsSL https://ollama.ai/install.sh | sh")
-            logger.info("")
-            logger.info("Option 2 - Download from:")
-            logger.info("  https://ollama.ai/download/linux")
-            logger.info("")
-        else:
-            logger.info("Download from: https://ollama.ai/download")
-            logger.info("")
-        logger.info("After installation, restart the API server.")
-        logger.info("="*60)
+        logger.info(_INSTALL_MSG)
     
     async def start_ollama_service(self) -> bool:
         """Start Ollama service if not running"""
         try:
-            # Check if Ollama service is running
-            result = subprocess.run(['pgrep', 'ollama'], capture_output=True, text=True)
-            if result.returncode == 0:
+            # Check if Ollama service is accepting connections
+            if await self._service_ready():
                 logger.info("Ollama service is already running")
                 return True
             
             logger.info("Starting Ollama service...")
             
-            # Start Ollama in background
-            subprocess.Popen(['ollama', 'serve'], 
-                           stdout=subprocess.DEVNULL, 
-                           stderr=subprocess.DEVNULL)
-            
-            # Wait a bit for service to start
-            await asyncio.sleep(3)
+            # Start Ollama in background, detached so it outlives this process
+            self._serve_proc = await asyncio.create_subprocess_exec(
+                'ollama', 'serve',
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+            self._invalidate_probes()
+            self._watch_serve_proc(self._serve_proc.pid)
             
-            # Verify service is running
-            result = subprocess.run(['pgrep', 'ollama'], capture_output=True, text=True)
-            if result.returncode == 0:
+            # Wait for the service to accept connections
+            if await self._poll_until(lambda: self._service_ready(fresh=True)):
                 logger.info("Ollama service started successfully")
                 return True
             else:
@@ -140,46 +413,156 @@ class OllamaManager:
             logger.info(f"Checking if model {self.model_name} is available...")
             
             # List available models
-            models = self.client.list()
-            available_models = [model['name'] for model in models.get('models', [])]
-            
-            if self.model_name in available_models:
+            if await self._has_model(self.model_name):
                 logger.info(f"Model {self.model_name} is already available")
                 return True
             
             logger.info(f"Downloading model {self.model_name}...")
             
             # Pull the model
-            stream = self.client.pull(self.model_name, stream=True)
-            
-            for chunk in stream:
-                if 'status' in chunk:
-                    if chunk['status'] == 'downloading':
-                        if 'completed' in chunk and 'total' in chunk:
-                            progress = (chunk['completed'] / chunk['total']) * 100
-                            logger.info(f"Download progress: {progress:.1f}%")
-                    elif chunk['status'] == 'success':
-                        logger.info(f"Model {self.model_name} downloaded successfully")
-                        return True
+            if self.http is not None:
+                await self._pull_async(self.http, self.model_name)
+            else:
+                async with create_http_client(self._base_url) as client:
+                    await self._pull_async(client, self.model_name)
             
+            self.invalidate_models_cache()
             return True
             
         except Exception as e:
             logger.error(f"Error downloading model: {str(e)}")
             return False
     
+    @staticmethod
+    async def _pull_async(client: httpx.AsyncClient, name: str):
+        """
+        Stream POST /api/pull without blocking the event loop
+        
+        Progress lines arrive per layer many times a second; only lines that can
+        change the logged 1% step, report success, or carry an error are parsed.
+        
+        Args:
+            client: Async client pointed at the Ollama host
+            name: Model to pull
+        """
+        log_progress = logger.isEnabledFor(logging.INFO)
+        last_logged = (None, -1)
+        
+        async with client.stream("POST", "/api/pull", json={"name": name, "stream": True},
+                                 timeout=httpx.Timeout(None, connect=2.0)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if '"error"' in line:
+                    raise RuntimeError(json.loads(line)["error"])
+                if '"success"' in line:
+                    logger.info(f"Model {name} downloaded successfully")
+                    return
+                if not (log_progress and '"completed"' in line):
+                    continue
+                
+                chunk = json.loads(line)
+                total = chunk.get('total')
+                if not total:
+                    continue
+                logged = (chunk.get('digest'), chunk['completed'] * 100 // total)
+                if logged != last_logged:
+                    last_logged = logged
+                    logger.info(f"Download progress ({chunk.get('status')}): {logged[1]}%")
+    
+    def invalidate_ready(self):
+        """Make the next ensure_model_available re-run its checks"""
+        self._ready = False
+    
+    def _load_state(self) -> bool:
+        """Check the on-disk state cache for a recent all-green result for this model and host"""
+        try:
+            with open(STATE_CACHE_PATH) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (
+            time.time() - state.get("ts", 0) < STATE_CACHE_TTL
+            and state.get("host") == self._base_url
+            and self._name_in(self.model_name, frozenset(state.get("known_models", ())))
+        )
+    
+    def _save_state(self):
+        """Record the current all-green state for other processes"""
+        state = {
+            "ollama_path": _ollama_bin(),
+            "host": self._base_url,
+            "known_models": sorted(self._model_names | {self.model_name}),
+            "ts": time.time()
+        }
+        try:
+            os.makedirs(os.path.dirname(STATE_CACHE_PATH), exist_ok=True)
+            tmp_path = f"{STATE_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, STATE_CACHE_PATH)
+        except OSError as e:
+            logger.debug(f"Could not write Ollama state cache: {e}")
+    
+    @staticmethod
+    def _clear_state():
+        try:
+            os.remove(STATE_CACHE_PATH)
+        except OSError:
+            pass
+    
+    async def _revalidate(self):
+        """Re-run the full checks behind an optimistic on-disk answer"""
+        if not await self._prepare_model():
+            logger.warning("⚠️ Cached Ollama state was stale; model not available")
+            self.invalidate_ready()
+    
     async def ensure_model_available(self) -> bool:
-        """Ensure Ollama is installed, service is running, and model is downloaded"""
+        """
+        Ensure Ollama is installed, service is running, and model is downloaded
+        
+        A recent all-green result from any process (see STATE_CACHE_PATH) is trusted
+        immediately and re-checked in the background.
+        """
+        if self._ready and time.monotonic() - self._ready_ts < READY_FLAG_TTL:
+            return True
+        
+        if not self._ready and self._load_state():
+            logger.info("Using cached Ollama state; revalidating in background")
+            self._ready = True
+            self._ready_ts = time.monotonic()
+            self._revalidate_task = asyncio.create_task(self._revalidate())
+            return True
+        
+        return await self._prepare_model()
+    
+    async def _prepare_model(self) -> bool:
+        """Install/start Ollama and pull the model as needed, recording the outcome"""
+        ready = await self._run_model_checks()
+        if ready:
+            self._ready = True
+            self._ready_ts = time.monotonic()
+            self._save_state()
+        else:
+            self._clear_state()
+        return ready
+    
+    async def _run_model_checks(self) -> bool:
+        """Install, start and pull whatever is missing; True when everything is green"""
         try:
-            # Check and install Ollama if needed
-            if not await self.ensure_ollama_installed():
-                logger.warning("Ollama installation failed. API will work without local model.")
-                return False
-            
-            # Start Ollama service if needed
-            if not await self.start_ollama_service():
-                logger.warning("Failed to start Ollama service. API will work without local model.")
-                return False
+            # Both checks are read-only, so run them together
+            installed, service_ok = await asyncio.gather(self._is_installed(), self._service_ready())
+            
+            # A reachable daemon is all we need, even if the binary isn't local
+            if not service_ok:
+                # Check and install Ollama if needed
+                if not installed and not await self.ensure_ollama_installed():
+                    logger.warning("Ollama installation failed. API will work without local model.")
+                    return False
+                
+                # Start Ollama service if needed
+                if not await self.start_ollama_service():
+                    logger.warning("Failed to start Ollama service. API will work without local model.")
+                    return False
             
             # Download model if needed
             if not await self.download_model():
@@ -194,81 +577,61 @@ class OllamaManager:
             return False
     
     def get_llm_instance(self):
-        """Get LLM instance for CrewAI integration"""
+        """Get LLM instance for CrewAI integration, reusing the one already built for this model and host"""
+        cache_key = (self.model_name, self._base_url)
+        llm_instance = self._llm_cache.get(cache_key)
+        if llm_instance is not None:
+            return llm_instance
+        
         try:
-            # First check if Ollama is available
-            result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.warning("Ollama not found. Creating fallback LLM instance.")
-                return self._create_fallback_llm()
-            
-            # Check if Ollama service is running
-            service_check = subprocess.run(['pgrep', 'ollama'], capture_output=True, text=True)
-            if service_check.returncode != 0:
-                logger.warning("Ollama service not running. Creating fallback LLM instance.")
+            # Probe the configured host rather than local processes, so a remote OLLAMA_HOST works
+            if not self._service_ready_sync():
+                logger.warning(f"Ollama service not reachable at {self._base_url}. Creating fallback LLM instance.")
                 return self._create_fallback_llm()
             
             # For CrewAI with LiteLLM integration, we need to use the correct format
             # CrewAI expects the model name to have the provider prefix
-            try:
-                from crewai import LLM
-                
-                # Use CrewAI's LLM class with the correct model format for Ollama
-                ollama_model_name = f"ollama/{self.model_name}"
-                
-                llm_instance = LLM(
-                    model=ollama_model_name,
-                    base_url="http://localhost:11434"
-                )
-                logger.info(f"Created CrewAI LLM instance for model {ollama_model_name}")
-                return llm_instance
-                
-            except ImportError:
+            if not CREWAI_LLM_AVAILABLE:
                 # Fallback to direct Ollama if CrewAI LLM not available
                 logger.warning("CrewAI LLM not available, using direct Ollama")
-                from langchain_community.llms import Ollama
-                
-                test_llm = Ollama(
-                    model=self.model_name,
-                    base_url="http://localhost:11434",
-                    temperature=0.7
-                )
-                logger.info(f"Created direct Ollama LLM instance for model {self.model_name}")
-                return test_llm
-            except Exception as e:
-                logger.warning(f"Failed to create CrewAI LLM instance: {e}. Trying direct Ollama...")
-                
-                # Fallback to direct Ollama
-                from langchain_community.llms import Ollama
-                
-                test_llm = Ollama(
-                    model=self.model_name,
-                    base_url="http://localhost:11434",
-                    temperature=0.7
-                )
-                logger.info(f"Created direct Ollama LLM instance for model {self.model_name}")
-                return test_llm
+                llm_instance = self._make_direct_ollama()
+            else:
+                try:
+                    # Use CrewAI's LLM class with the correct model format for Ollama
+                    ollama_model_name = f"ollama/{self.model_name}"
+                    
+                    llm_instance = LLM(
+                        model=ollama_model_name,
+                        base_url=self._base_url
+                    )
+                    logger.info(f"Created CrewAI LLM instance for model {ollama_model_name}")
+                except Exception as e:
+                    logger.warning(f"Failed to create CrewAI LLM instance: {e}. Trying direct Ollama...")
+                    llm_instance = self._make_direct_ollama()
             
-        except ImportError:
-            logger.warning("langchain_community not available. Installing...")
-            try:
-                subprocess.run([sys.executable, "-m", "pip", "install", "langchain-community"], 
-                             capture_output=True, text=True)
-                from langchain_community.llms import Ollama
-                
-                llm = Ollama(
-                    model=self.model_name,
-                    base_url="http://localhost:11434",
-                    temperature=0.7
-                )
-                return llm
-            except Exception as e:
-                logger.warning(f"Failed to install/import langchain_community: {e}. Using fallback.")
-                return self._create_fallback_llm()
+            self._llm_cache[cache_key] = llm_instance
+            return llm_instance
+            
+        except ImportError as e:
+            logger.warning(f"{e}; install langchain-community for direct Ollama support. Using fallback.")
+            return self._create_fallback_llm()
         except Exception as e:
             logger.warning(f"Error creating LLM instance: {str(e)}. Using fallback.")
             return self._create_fallback_llm()
     
+    def _make_direct_ollama(self):
+        """Build a langchain Ollama LLM; raises ImportError if langchain_community is missing"""
+        if not LANGCHAIN_OLLAMA_AVAILABLE:
+            raise ImportError("langchain_community is not installed")
+        
+        llm_instance = OllamaLLM(
+            model=self.model_name,
+            base_url=self._base_url,
+            temperature=0.7
+        )
+        logger.info(f"Created direct Ollama LLM instance for model {self.model_name}")
+        return llm_instance
+    
     def _create_fallback_llm(self):
         """Create a fallback LLM instance when Ollama is not available"""
         try:
@@ -297,21 +660,84 @@ class OllamaManager:
             return self._create_mock_llm()
     
     def _create_mock_llm(self):
-        """Create a simple mock LLM for when no real LLM is available"""
-        class MockLLM:
-            def __init__(self):
-                self.model_name = "mock-llm"
-            
-            def __call__(self, prompt: str, **kwargs) -> str:
-                return f"[MOCK RESPONSE] Analysis for: {prompt[:100]}..."
-            
-            def invoke(self, prompt: str, **kwargs) -> str:
-                return f"[MOCK RESPONSE] Analysis for: {prompt[:100]}..."
-            
-            def predict(self, text: str, **kwargs) -> str:
-                return f"[MOCK RESPONSE] Analysis for: {text[:100]}..."
+        """Return the shared mock LLM for when no real LLM is available"""
+        return _MOCK_LLM
+    
+    async def list_models(self) -> List[str]:
+        """List the names of models available on the Ollama host"""
+        if self.http is not None:
+            response = await self.http.get("/api/tags")
+            response.raise_for_status()
+            models = response.json()
+        else:
+            models = await self.async_client.list()
+        return [model['name'] for model in models.get('models', [])]
+    
+    async def list_models_cached(self, ttl: float = 30) -> List[str]:
+        """
+        List available models, reusing the previous answer for up to ttl seconds
+        
+        Args:
+            ttl: Seconds a fetched model list stays valid
         
-        return MockLLM()
+        Returns:
+            List of model names
+        """
+        if self._models_cache is not None and time.monotonic() < self._models_cache_expires:
+            return self._models_cache
+        
+        self._models_cache = await self.list_models()
+        self._model_names = frozenset(self._models_cache)
+        self._models_cache_expires = time.monotonic() + ttl
+        return self._models_cache
+    
+    async def model_names_cached(self, ttl: float = 30) -> FrozenSet[str]:
+        """Set view of list_models_cached for O(1) membership checks"""
+        await self.list_models_cached(ttl)
+        return self._model_names
+    
+    @staticmethod
+    def _name_in(name: str, names: FrozenSet[str]) -> bool:
+        """Membership test that treats an untagged name as name:latest, like Ollama does"""
+        return name in names or (":" not in name and f"{name}:latest" in names)
+    
+    async def _has_model(self, name: str) -> bool:
+        """
+        Check whether a model is installed with a single show request,
+        falling back to the cached model list if the daemon can't answer that way
+        """
+        try:
+            if self.http is not None:
+                response = await self.http.post("/api/show", json={"name": name})
+                if response.status_code == 404:
+                    return False
+                response.raise_for_status()
+            else:
+                await self.async_client.show(name)
+            return True
+        except ollama.ResponseError as e:
+            if e.status_code == 404:
+                return False
+        except httpx.HTTPError:
+            pass
+        return self._name_in(name, await self.model_names_cached())
+    
+    def invalidate_models_cache(self):
+        """Drop the cached model list, e.g. after a pull or an external 'ollama pull/rm'"""
+        self._models_cache = None
+        self._models_cache_expires = 0.0
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """Lightweight reachability check for health endpoints, backed by the cached model list"""
+        try:
+            models = await self.model_names_cached()
+            return {
+                "status": "healthy",
+                "model_name": self.model_name,
+                "model_available": self._name_in(self.model_name, models)
+            }
+        except Exception as e:
+            return {"status": "unavailable", "model_name": self.model_name, "error": str(e)}
     
     async def get_model_status(self) -> Dict[str, Any]:
         """Get the current status of the model and Ollama service"""
@@ -323,24 +749,19 @@ class OllamaManager:
                 "model_name": self.model_name
             }
             
-            # Check if Ollama is installed
-            result = subprocess.run(['which', 'ollama'], capture_output=True, text=True)
-            status["ollama_installed"] = result.returncode == 0
+            # Check the binary and the daemon in one round
+            status["ollama_installed"], status["service_running"] = await asyncio.gather(
+                self._is_installed(), self._service_ready()
+            )
             
-            if status["ollama_installed"]:
-                # Check if service is running
-                result = subprocess.run(['pgrep', 'ollama'], capture_output=True, text=True)
-                status["service_running"] = result.returncode == 0
-                
-                if status["service_running"]:
-                    # Check if model is available
-                    try:
-                        models = self.client.list()
-                        available_models = [model['name'] for model in models.get('models', [])]
-                        status["model_available"] = self.model_name in available_models
-                        status["available_models"] = available_models
-                    except Exception as e:
-                        status["error"] = f"Error checking models: {str(e)}"
+            if status["service_running"]:
+                # Check if model is available
+                try:
+                    available_models = await self.list_models_cached()
+                    status["model_available"] = self._name_in(self.model_name, self._model_names)
+                    status["available_models"] = available_models
+                except Exception as e:
+                    status["error"] = f"Error checking models: {str(e)}"
             
             return status
             
@@ -348,23 +769,37 @@ class OllamaManager:
             logger.error(f"Error getting model status: {str(e)}")
             return {"error": str(e)}
     
-    async def generate_response(self, prompt: str, context: Optional[str] = None) -> str:
-        """Generate response using the Deepseek model"""
+    async def generate_response(self, prompt: str, context: Optional[str] = None, model: Optional[str] = None,
+                                **overrides: Any) -> str:
+        """Generate response using the Deepseek model, or another installed model if given; overrides adjust the default options"""
         try:
+            model = model or self.model_name
             full_prompt = f"{context}\n\n{prompt}" if context else prompt
-            
-            response = self.client.generate(
-                model=self.model_name,
+            options = {**self._DEFAULT_OPTIONS, **overrides} if overrides else self._DEFAULT_OPTIONS
+            
+            if self.http is not None:
+                response = await self.http.post("/api/generate", json={
+                    "model": model,
+                    "prompt": full_prompt,
+                    "stream": False,
+                    "options": options
+                })
+                response.raise_for_status()
+                return response.json()['response']
+            
+            response = await self.async_client.generate(
+                model=model,
                 prompt=full_prompt,
-                options={
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "max_tokens": 2048
-                }
+                options=options
             )
             
             return response['response']
             
+        except (httpx.TransportError, ConnectionError) as e:
+            # Daemon went away; don't keep vouching for it
+            self.invalidate_ready()
+            logger.error(f"Error generating response: {str(e)}")
+            raise
         except Exception as e:
             logger.error(f"Error generating response: {str(e)}")
             raise
@@ -6,36 +6,90 @@ Provides MongoDB connectivity and data management for CrewAI pentest results
 """
 
 import os
+import atexit
+import asyncio
+import functools
+import importlib.util
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
-import json
-from bson import ObjectId
 
-try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-    PYMONGO_AVAILABLE = True
-except ImportError:
-    PYMONGO_AVAILABLE = False
+# PyMongo (and Motor, which loads it) pull in ssl, dns and bson, so they are only
+# imported once a connection is made; importing this module stays cheap
+PYMONGO_AVAILABLE = importlib.util.find_spec("pymongo") is not None
+if not PYMONGO_AVAILABLE:
     print("⚠️  PyMongo not installed. MongoDB features will be disabled.")
     print("   Install with: pip install pymongo")
 
+MOTOR_AVAILABLE = importlib.util.find_spec("motor") is not None
+
+# Shared by the PyMongo and Motor clients. minPoolSize keeps a few warm connections
+# so concurrent agents don't pay handshakes; compression only lists installed codecs.
+CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 5000,
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": 5,
+    "maxIdleTimeMS": 60000,
+    "maxConnecting": 4,
+    "compressors": ",".join(
+        [name for name, module in (("zstd", "zstandard"), ("snappy", "snappy"))
+         if importlib.util.find_spec(module) is not None] + ["zlib"]
+    ),
+    "retryWrites": True,
+    "appname": "crewai_pentest"
+}
+
+# datetime.isoformat() of the naive UTC datetimes PyMongo decodes: microseconds (BSON
+# dates carry milliseconds), and no fraction at all on a whole second
+ISO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%L000"
+ISO_DATE_FORMAT_WHOLE_SECOND = "%Y-%m-%dT%H:%M:%S"
+
+# Fetch up to this many documents per round-trip, so typical limits come back in one batch
+FIND_BATCH_LIMIT = 1000
+
+# get_stats answers are reused this long to absorb UI polling
+STATS_CACHE_TTL = 5.0
+STATS_COLLECTIONS = ("pentest_results", "tool_results")
+
+# Log-style collections whose inserts are buffered and written with insert_many
+BUFFERED_COLLECTIONS = ("tool_results", "agent_actions", "command_executions")
+WRITE_BATCH_SIZE = int(os.getenv("MONGO_WRITE_BATCH_SIZE", "500"))
+WRITE_MAX_DELAY_MS = int(os.getenv("MONGO_WRITE_MAX_DELAY_MS", "200"))
+
 class CrewAIMongoDB:
     """MongoDB integration for CrewAI penetration testing results"""
     
-    def __init__(self, connection_string: str = None, database_name: str = "crewai_pentest"):
+    def __init__(self, connection_string: str = None, database_name: str = "crewai_pentest",
+                 batch_size: int = WRITE_BATCH_SIZE, max_delay_ms: int = WRITE_MAX_DELAY_MS):
         """
         Initialize MongoDB connection
         
         Args:
             connection_string: MongoDB connection string (defaults to localhost)
             database_name: Database name to use
+            batch_size: Buffered documents per collection that trigger an immediate flush
+            max_delay_ms: Longest a buffered document waits before being flushed
         """
         self.database_name = database_name
+        self.batch_size = batch_size
+        self.max_delay_ms = max_delay_ms
+        self._buffers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._buffer_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # One writer thread: flushes never run on the caller (or event loop) thread, and stay in order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-writer")
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_cache_expires = 0.0
         self.connection_string = connection_string or "mongodb://localhost:27017/"
         self.client = None
         self.db = None
         self.connected = False
+        self._async_client = None
+        self._async_db = None
+        self._object_id = None
         
         if PYMONGO_AVAILABLE:
             self._connect()
@@ -44,15 +98,19 @@ class CrewAIMongoDB:
     
     def _connect(self):
         """Establish MongoDB connection"""
+        from bson import ObjectId
+        from pymongo import MongoClient
+        from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+        
+        self._object_id = ObjectId
         try:
-            self.client = MongoClient(
-                self.connection_string,
-                serverSelectionTimeoutMS=5000  # 5 second timeout
-            )
+            self.client = MongoClient(self.connection_string, **CLIENT_OPTIONS)
             # Test the connection
             self.client.admin.command('ping')
             self.db = self.client[self.database_name]
+            self._ensure_indexes()
             self.connected = True
+            atexit.register(self.flush)
             print(f"✅ Connected to MongoDB: {self.database_name}")
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             print(f"❌ Failed to connect to MongoDB: {e}")
@@ -62,9 +120,167 @@ class CrewAIMongoDB:
             print(f"❌ MongoDB connection error: {e}")
             self.connected = False
     
+    def _ensure_indexes(self):
+        """Create the indexes the retrieval queries sort and filter on (idempotent)"""
+        indexes = {
+            # Recent-session lookups sort on this
+            "pentest_results": [[("stored_at", -1)]],
+            # Keep filtered agent-action sorts (dashboard, per-session views) inside the index
+            "agent_actions": [
+                [("pentest_session_id", 1), ("timestamp", -1)],
+                [("agent_role", 1), ("timestamp", -1)]
+            ],
+            # get_tool_results filters by tool and/or target (the task planner by target alone);
+            # the session index serves the recent-sessions $lookup
+            "tool_results": [
+                [("tool_name", 1), ("target", 1), ("executed_at", -1)],
+                [("target", 1), ("executed_at", -1)],
+                [("executed_at", -1)],
+                [("result_data.session_id", 1)]
+            ],
+            "command_executions": [
+                [("executed_at", -1)],
+                [("context.session_id", 1)]
+            ]
+        }
+        for collection_name, keys_list in indexes.items():
+            for keys in keys_list:
+                try:
+                    self.db[collection_name].create_index(keys)
+                except Exception as e:
+                    # An existing index with other options shouldn't keep us from connecting
+                    print(f"⚠️  Could not create index {keys} on {collection_name}: {e}")
+    
     def is_connected(self) -> bool:
         """Check if MongoDB connection is active"""
-        return self.connected and PYMONGO_AVAILABLE
+        # Only _connect sets this, and it only runs when PyMongo imported
+        return self.connected
+    
+    @property
+    def async_db(self):
+        """Motor database handle, created lazily on the running event loop"""
+        if self._async_db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self._async_client = AsyncIOMotorClient(self.connection_string, **CLIENT_OPTIONS)
+            self._async_db = self._async_client[self.database_name]
+        return self._async_db
+    
+    def _buffer_insert(self, collection_name: str, document: Dict[str, Any]) -> str:
+        """
+        Queue a document for a batched insert_many
+        
+        The batch is flushed when it reaches batch_size or after max_delay_ms,
+        whichever comes first.
+        
+        Args:
+            collection_name: Target collection (one of BUFFERED_COLLECTIONS)
+            document: Document to insert
+            
+        Returns:
+            ObjectId string assigned to the document up front
+        """
+        document["_id"] = self._object_id()
+        with self._buffer_lock:
+            buffer = self._buffers[collection_name]
+            buffer.append(document)
+            full = len(buffer) >= self.batch_size
+            if not full and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.max_delay_ms / 1000, self._schedule_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        
+        if full:
+            self._writer.submit(self._flush, collection_name)
+        return str(document["_id"])
+    
+    def _schedule_flush(self):
+        try:
+            self._writer.submit(self._flush_all)
+        except RuntimeError:
+            pass  # writer already shut down by close_connection
+    
+    def _flush(self, collection_name: str):
+        """Write out one collection's buffered documents"""
+        with self._buffer_lock:
+            documents = self._buffers.pop(collection_name, None)
+        if not documents:
+            return
+        
+        from pymongo.errors import BulkWriteError
+        
+        try:
+            # Append-only log data: skip any schema validator
+            self.db[collection_name].insert_many(documents, ordered=False, bypass_document_validation=True)
+        except BulkWriteError as e:
+            # Unordered: the rest of the batch was still written
+            write_errors = e.details.get("writeErrors", [])
+            print(f"⚠️  {len(write_errors)} of {len(documents)} {collection_name} documents not written: {write_errors}")
+        except Exception as e:
+            print(f"❌ Error flushing {len(documents)} {collection_name} documents: {e}")
+    
+    def _flush_all(self):
+        """Write out all buffered documents; only runs on the writer thread"""
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending = list(self._buffers)
+        for collection_name in pending:
+            self._flush(collection_name)
+    
+    def flush(self):
+        """
+        Write out all buffered documents and wait until they are stored
+        
+        Runs on the writer thread behind any batch it is already inserting, so a
+        read issued after flush() sees every write queued before it.
+        """
+        try:
+            self._writer.submit(self._flush_all).result()
+        except RuntimeError:
+            pass  # writer already shut down by close_connection, which flushed
+    
+    async def _flush_async(self):
+        """Async variant of flush; waits for the writer without blocking the event loop"""
+        try:
+            await asyncio.wrap_future(self._writer.submit(self._flush_all))
+        except RuntimeError:
+            pass
+    
+    @staticmethod
+    def _json_safe_stage(time_field: Optional[str]) -> Dict[str, Any]:
+        """$set stage converting _id and the timestamp to strings on the server, so results need no Python fixup"""
+        converted = {"_id": {"$convert": {"input": "$_id", "to": "string", "onError": "$_id"}}}
+        if time_field:
+            date = f"${time_field}"
+            # Only real dates are formatted; legacy string timestamps (e.g. from write_ui_data.py)
+            # pass through unchanged instead of failing the whole aggregation
+            converted[time_field] = {"$cond": [
+                {"$eq": [{"$type": date}, "date"]},
+                {"$cond": [
+                    {"$eq": [{"$millisecond": date}, 0]},
+                    {"$dateToString": {"date": date, "format": ISO_DATE_FORMAT_WHOLE_SECOND}},
+                    {"$dateToString": {"date": date, "format": ISO_DATE_FORMAT}}
+                ]},
+                date
+            ]}
+        return {"$set": converted}
+    
+    @classmethod
+    def _find_pipeline(cls, query: Dict[str, Any], time_field: str, limit: int,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Newest-first find() as an aggregation that returns JSON-safe documents"""
+        pipeline = [{"$match": query}, {"$sort": {time_field: -1}}, {"$limit": limit}]
+        if fields:
+            pipeline.append({"$project": {field: 1 for field in fields}})
+            if time_field not in fields:
+                time_field = None
+        pipeline.append(cls._json_safe_stage(time_field))
+        return pipeline
+    
+    async def astore_pentest_result(self, result_data: Dict[str, Any]) -> Optional[str]:
+        """Async variant of store_pentest_result; the acknowledged insert runs off the event loop"""
+        return await asyncio.to_thread(self.store_pentest_result, result_data)
     
     def store_pentest_result(self, result_data: Dict[str, Any]) -> Optional[str]:
         """
@@ -76,7 +292,7 @@ class CrewAIMongoDB:
         Returns:
             ObjectId string if successful, None if failed
         """
-        if not self.is_connected():
+        if not self.connected:
             print("⚠️  MongoDB not connected - cannot store results")
             return None
         
@@ -84,7 +300,7 @@ class CrewAIMongoDB:
             # Add metadata
             document = {
                 **result_data,
-                "stored_at": datetime.utcnow(),
+                "stored_at": datetime.now(timezone.utc),
                 "collection_type": "pentest_results",
                 "version": "1.0"
             }
@@ -112,7 +328,7 @@ class CrewAIMongoDB:
         Returns:
             ObjectId string if successful, None if failed
         """
-        if not self.is_connected():
+        if not self.connected:
             print("⚠️  MongoDB not connected - cannot store tool results")
             return None
         
@@ -122,23 +338,23 @@ class CrewAIMongoDB:
                 "tool_name": tool_name,
                 "target": target,
                 "result_data": result_data,
-                "executed_at": datetime.utcnow(),
+                "executed_at": datetime.now(timezone.utc),
                 "collection_type": "tool_results",
                 "version": "1.0"
             }
             
-            # Insert into tool_results collection
-            collection = self.db.tool_results
-            result = collection.insert_one(document)
+            # Queue for a batched insert into tool_results
+            inserted_id = self._buffer_insert("tool_results", document)
             
-            print(f"💾 Tool results ({tool_name}) stored in MongoDB: {result.inserted_id}")
-            return str(result.inserted_id)
+            print(f"💾 Tool results ({tool_name}) queued for MongoDB: {inserted_id}")
+            return inserted_id
             
         except Exception as e:
             print(f"❌ Error storing tool results: {e}")
             return None
     
-    def store_agent_action(self, agent_role: str, action_type: str, action_data: Dict[str, Any], pentest_session_id: Optional[str] = None) -> Optional[str]:
+    def store_agent_action(self, agent_role: str, action_type: str, action_data: Dict[str, Any], pentest_session_id: Optional[str] = None,
+                           fast_insert: bool = True) -> Optional[str]:
         """
         Store agent actions and commands in MongoDB
         
@@ -147,11 +363,12 @@ class CrewAIMongoDB:
             action_type: Type of action (e.g., 'task_start', 'tool_execution', 'thinking', 'task_complete')
             action_data: Detailed action data including commands, thoughts, outputs
             pentest_session_id: Associated pentest session ID for grouping
+            fast_insert: Queue for a batched write; pass False to insert now and return after it is stored
             
         Returns:
             ObjectId string if successful, None if failed
         """
-        if not self.is_connected():
+        if not self.connected:
             print("⚠️  MongoDB not connected - cannot store agent actions")
             return None
         
@@ -162,23 +379,26 @@ class CrewAIMongoDB:
                 "action_type": action_type,
                 "action_data": action_data,
                 "pentest_session_id": pentest_session_id,
-                "timestamp": datetime.utcnow(),
+                "timestamp": datetime.now(timezone.utc),
                 "collection_type": "agent_actions",
                 "version": "1.0"
             }
             
-            # Insert into agent_actions collection
-            collection = self.db.agent_actions
-            result = collection.insert_one(document)
+            # Queue for a batched insert into agent_actions
+            if fast_insert:
+                inserted_id = self._buffer_insert("agent_actions", document)
+            else:
+                inserted_id = str(self.db.agent_actions.insert_one(document).inserted_id)
             
-            print(f"📝 Agent action ({agent_role} - {action_type}) stored in MongoDB: {result.inserted_id}")
-            return str(result.inserted_id)
+            print(f"📝 Agent action ({agent_role} - {action_type}) queued for MongoDB: {inserted_id}")
+            return inserted_id
             
         except Exception as e:
             print(f"❌ Error storing agent action: {e}")
             return None
     
-    def store_command_execution(self, command: str, output: str, success: bool, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    def store_command_execution(self, command: str, output: str, success: bool, context: Optional[Dict[str, Any]] = None,
+                                fast_insert: bool = True) -> Optional[str]:
         """
         Store command executions and their outputs
         
@@ -187,11 +407,12 @@ class CrewAIMongoDB:
             output: Output from the command
             success: Whether the command executed successfully
             context: Additional context (agent, tool, session, etc.)
+            fast_insert: Queue for a batched write; pass False to insert now and return after it is stored
             
         Returns:
             ObjectId string if successful, None if failed
         """
-        if not self.is_connected():
+        if not self.connected:
             print("⚠️  MongoDB not connected - cannot store command execution")
             return None
         
@@ -202,28 +423,114 @@ class CrewAIMongoDB:
                 "output": output,
                 "success": success,
                 "context": context or {},
-                "executed_at": datetime.utcnow(),
+                "executed_at": datetime.now(timezone.utc),
                 "collection_type": "command_executions",
                 "version": "1.0"
             }
             
-            # Insert into command_executions collection
-            collection = self.db.command_executions
-            result = collection.insert_one(document)
+            # Queue for a batched insert into command_executions
+            if fast_insert:
+                inserted_id = self._buffer_insert("command_executions", document)
+            else:
+                inserted_id = str(self.db.command_executions.insert_one(document).inserted_id)
             
-            print(f"⚡ Command execution stored in MongoDB: {result.inserted_id}")
-            return str(result.inserted_id)
+            print(f"⚡ Command execution queued for MongoDB: {inserted_id}")
+            return inserted_id
             
         except Exception as e:
             print(f"❌ Error storing command execution: {e}")
             return None
     
-    def get_pentest_results(self, limit: int = 10) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _dashboard_pipeline(limit: int, action_limit: int, agent_role: Optional[str],
+                            pentest_session_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Recent results and agent actions in one aggregation rooted at pentest_results"""
+        action_query = {}
+        if agent_role:
+            action_query["agent_role"] = agent_role
+        if pentest_session_id:
+            action_query["pentest_session_id"] = pentest_session_id
+        
+        return [
+            {"$sort": {"stored_at": -1}},
+            {"$limit": limit},
+            {"$set": {"_facet": "recent_results"}},
+            {"$unionWith": {
+                "coll": "agent_actions",
+                "pipeline": [
+                    {"$match": action_query},
+                    {"$sort": {"timestamp": -1}},
+                    {"$limit": action_limit},
+                    {"$set": {"_facet": "agent_actions"}}
+                ]
+            }},
+            {"$facet": {
+                "recent_results": [{"$match": {"_facet": "recent_results"}}, {"$unset": "_facet"},
+                                   CrewAIMongoDB._json_safe_stage("stored_at")],
+                "agent_actions": [{"$match": {"_facet": "agent_actions"}}, {"$unset": "_facet"},
+                                  CrewAIMongoDB._json_safe_stage("timestamp")]
+            }}
+        ]
+    
+    @staticmethod
+    def _shape_dashboard(documents: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        facets = documents[0] if documents else {}
+        return {
+            "recent_results": facets.get("recent_results", []),
+            "agent_actions": facets.get("agent_actions", [])
+        }
+    
+    def get_dashboard(self, limit: int = 10, action_limit: int = 50, agent_role: Optional[str] = None,
+                      pentest_session_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Retrieve recent pentest results and agent actions in a single round-trip
+        
+        Args:
+            limit: Maximum number of pentest results
+            action_limit: Maximum number of agent actions
+            agent_role: Filter actions by agent role
+            pentest_session_id: Filter actions by session ID
+            
+        Returns:
+            Dictionary with recent_results and agent_actions lists, newest first
+        """
+        if not self.is_connected():
+            return {"recent_results": [], "agent_actions": []}
+        
+        self.flush()
+        
+        try:
+            pipeline = self._dashboard_pipeline(limit, action_limit, agent_role, pentest_session_id)
+            return self._shape_dashboard(list(self.db.pentest_results.aggregate(pipeline)))
+        except Exception as e:
+            print(f"❌ Error retrieving dashboard: {e}")
+            return {"recent_results": [], "agent_actions": []}
+    
+    async def get_dashboard_async(self, limit: int = 10, action_limit: int = 50, agent_role: Optional[str] = None,
+                                  pentest_session_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Async variant of get_dashboard using Motor"""
+        if not self.is_connected():
+            return {"recent_results": [], "agent_actions": []}
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_dashboard, limit, action_limit, agent_role, pentest_session_id)
+        
+        await self._flush_async()
+        
+        try:
+            pipeline = self._dashboard_pipeline(limit, action_limit, agent_role, pentest_session_id)
+            cursor = self.async_db.pentest_results.aggregate(pipeline)
+            return self._shape_dashboard(await cursor.to_list(length=1))
+        except Exception as e:
+            print(f"❌ Error retrieving dashboard: {e}")
+            return {"recent_results": [], "agent_actions": []}
+    
+    def get_pentest_results(self, limit: int = 10, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve recent penetration test results
         
         Args:
             limit: Maximum number of results to return
+            fields: Only return these fields (plus _id)
             
         Returns:
             List of pentest result documents
@@ -233,22 +540,15 @@ class CrewAIMongoDB:
         
         try:
             collection = self.db.pentest_results
-            results = list(collection.find().sort("stored_at", -1).limit(limit))
-            
-            # Convert ObjectId to string for JSON serialization
-            for result in results:
-                if "_id" in result:
-                    result["_id"] = str(result["_id"])
-                if "stored_at" in result:
-                    result["stored_at"] = result["stored_at"].isoformat()
-            
-            return results
+            pipeline = self._find_pipeline({}, "stored_at", limit, fields)
+            return list(collection.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT)))
             
         except Exception as e:
             print(f"❌ Error retrieving pentest results: {e}")
             return []
     
-    def get_tool_results(self, tool_name: Optional[str] = None, target: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_tool_results(self, tool_name: Optional[str] = None, target: Optional[str] = None, limit: int = 10,
+                         fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve tool execution results
         
@@ -256,6 +556,7 @@ class CrewAIMongoDB:
             tool_name: Filter by specific tool name
             target: Filter by specific target
             limit: Maximum number of results to return
+            fields: Only return these fields (plus _id)
             
         Returns:
             List of tool result documents
@@ -263,6 +564,8 @@ class CrewAIMongoDB:
         if not self.is_connected():
             return []
         
+        self.flush()
+        
         try:
             collection = self.db.tool_results
             query = {}
@@ -272,22 +575,15 @@ class CrewAIMongoDB:
             if target:
                 query["target"] = target
             
-            results = list(collection.find(query).sort("executed_at", -1).limit(limit))
-            
-            # Convert ObjectId to string for JSON serialization
-            for result in results:
-                if "_id" in result:
-                    result["_id"] = str(result["_id"])
-                if "executed_at" in result:
-                    result["executed_at"] = result["executed_at"].isoformat()
-            
-            return results
+            pipeline = self._find_pipeline(query, "executed_at", limit, fields)
+            return list(collection.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT)))
             
         except Exception as e:
             print(f"❌ Error retrieving tool results: {e}")
             return []
     
-    def get_agent_actions(self, agent_role: Optional[str] = None, pentest_session_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_agent_actions(self, agent_role: Optional[str] = None, pentest_session_id: Optional[str] = None, limit: int = 50,
+                          fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve agent actions and commands
         
@@ -295,6 +591,7 @@ class CrewAIMongoDB:
             agent_role: Filter by specific agent role
             pentest_session_id: Filter by specific pentest session
             limit: Maximum number of results to return
+            fields: Only return these fields (plus _id)
             
         Returns:
             List of agent action documents
@@ -302,6 +599,8 @@ class CrewAIMongoDB:
         if not self.is_connected():
             return []
         
+        self.flush()
+        
         try:
             collection = self.db.agent_actions
             query = {}
@@ -311,27 +610,20 @@ class CrewAIMongoDB:
             if pentest_session_id:
                 query["pentest_session_id"] = pentest_session_id
             
-            results = list(collection.find(query).sort("timestamp", -1).limit(limit))
-            
-            # Convert ObjectId to string for JSON serialization
-            for result in results:
-                if "_id" in result:
-                    result["_id"] = str(result["_id"])
-                if "timestamp" in result:
-                    result["timestamp"] = result["timestamp"].isoformat()
-            
-            return results
+            pipeline = self._find_pipeline(query, "timestamp", limit, fields)
+            return list(collection.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT)))
             
         except Exception as e:
             print(f"❌ Error retrieving agent actions: {e}")
             return []
     
-    def get_command_executions(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_command_executions(self, limit: int = 50, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retrieve command executions
         
         Args:
             limit: Maximum number of results to return
+            fields: Only return these fields (plus _id)
             
         Returns:
             List of command execution documents
@@ -339,23 +631,27 @@ class CrewAIMongoDB:
         if not self.is_connected():
             return []
         
+        self.flush()
+        
         try:
             collection = self.db.command_executions
-            results = list(collection.find().sort("executed_at", -1).limit(limit))
-            
-            # Convert ObjectId to string for JSON serialization
-            for result in results:
-                if "_id" in result:
-                    result["_id"] = str(result["_id"])
-                if "executed_at" in result:
-                    result["executed_at"] = result["executed_at"].isoformat()
-            
-            return results
+            pipeline = self._find_pipeline({}, "executed_at", limit, fields)
+            return list(collection.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT)))
             
         except Exception as e:
             print(f"❌ Error retrieving command executions: {e}")
             return []
     
+    def _cache_stats(self, counts: Dict[str, int]) -> Dict[str, Any]:
+        self._stats_cache = {
+            "database": self.database_name,
+            "connected": True,
+            "collections": counts,
+            "total_documents": sum(counts.values())
+        }
+        self._stats_cache_expires = time.monotonic() + STATS_CACHE_TTL
+        return self._stats_cache
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get database statistics
@@ -365,35 +661,245 @@ class CrewAIMongoDB:
         """
         if not self.is_connected():
             return {"error": "Not connected to MongoDB"}
+        if self._stats_cache is not None and time.monotonic() < self._stats_cache_expires:
+            return self._stats_cache
+        
+        self.flush()
         
         try:
-            stats = {
-                "database": self.database_name,
-                "connected": True,
-                "collections": {},
-                "total_documents": 0
-            }
+            from pymongo.errors import OperationFailure
             
-            # Get collection stats
-            for collection_name in ["pentest_results", "tool_results"]:
-                if collection_name in self.db.list_collection_names():
-                    count = self.db[collection_name].count_documents({})
-                    stats["collections"][collection_name] = count
-                    stats["total_documents"] += count
-                else:
-                    stats["collections"][collection_name] = 0
+            counts = {}
+            for collection_name in STATS_COLLECTIONS:
+                # Metadata count: no collection scan, and 0 for a missing collection
+                try:
+                    counts[collection_name] = self.db[collection_name].estimated_document_count()
+                except OperationFailure:
+                    counts[collection_name] = 0
             
-            return stats
+            return self._cache_stats(counts)
+            
+        except Exception as e:
+            return {"error": f"Error getting stats: {e}"}
+    
+    @staticmethod
+    def _recent_sessions_pipeline(limit: int) -> List[Dict[str, Any]]:
+        """Aggregation returning summaries of the most recent pentest sessions in one query"""
+        return [
+            {"$match": {"session_id": {"$exists": True, "$ne": None}}},
+            {"$group": {
+                "_id": "$session_id",
+                "pentest_results": {"$sum": 1},
+                "last_stored_at": {"$max": "$stored_at"}
+            }},
+            {"$sort": {"last_stored_at": -1}},
+            {"$limit": limit},
+            {"$lookup": {
+                "from": "agent_actions",
+                "localField": "_id",
+                "foreignField": "pentest_session_id",
+                "pipeline": [{"$project": {"_id": 0, "agent_role": 1, "action_type": 1}}],
+                "as": "actions"
+            }},
+            {"$lookup": {
+                "from": "tool_results",
+                "localField": "_id",
+                "foreignField": "result_data.session_id",
+                "pipeline": [{"$project": {"_id": 0, "tool_name": 1, "success": "$result_data.success"}}],
+                "as": "tools"
+            }},
+            {"$lookup": {
+                "from": "command_executions",
+                "localField": "_id",
+                "foreignField": "context.session_id",
+                "pipeline": [{"$count": "n"}],
+                "as": "commands"
+            }},
+            {"$project": {
+                "_id": 0,
+                "session_id": "$_id",
+                "agent_actions": {"$size": "$actions"},
+                "tool_executions": {"$size": "$tools"},
+                "command_executions": {"$ifNull": [{"$first": "$commands.n"}, 0]},
+                "pentest_results": 1,
+                "summary": {
+                    "tools_used": {"$setUnion": ["$tools.tool_name", []]},
+                    "agents_active": {"$setUnion": ["$actions.agent_role", []]},
+                    "action_types": {"$setUnion": ["$actions.action_type", []]},
+                    "success_rate": {"$multiply": [
+                        {"$divide": [
+                            {"$size": {"$filter": {"input": "$tools", "cond": "$$this.success"}}},
+                            {"$max": [{"$size": "$tools"}, 1]}
+                        ]},
+                        100
+                    ]}
+                }
+            }}
+        ]
+    
+    def get_recent_session_summaries(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Retrieve summaries of the most recent pentest sessions
+        
+        Args:
+            limit: Maximum number of sessions to return
+            
+        Returns:
+            List of session summary documents, newest first
+        """
+        if not self.is_connected():
+            return []
+        
+        self.flush()
+        
+        try:
+            return list(self.db.pentest_results.aggregate(self._recent_sessions_pipeline(limit)))
+        except Exception as e:
+            print(f"❌ Error retrieving recent sessions: {e}")
+            return []
+    
+    async def get_recent_session_summaries_async(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Async variant of get_recent_session_summaries using Motor"""
+        if not self.is_connected():
+            return []
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_recent_session_summaries, limit)
+        
+        await self._flush_async()
+        
+        try:
+            cursor = self.async_db.pentest_results.aggregate(self._recent_sessions_pipeline(limit))
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"❌ Error retrieving recent sessions: {e}")
+            return []
+    
+    async def get_pentest_results_async(self, limit: int = 10, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Async variant of get_pentest_results using Motor"""
+        if not self.is_connected():
+            return []
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_pentest_results, limit, fields)
+        
+        try:
+            pipeline = self._find_pipeline({}, "stored_at", limit, fields)
+            cursor = self.async_db.pentest_results.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT))
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"❌ Error retrieving pentest results: {e}")
+            return []
+    
+    async def get_tool_results_async(self, tool_name: Optional[str] = None, target: Optional[str] = None, limit: int = 10,
+                                     fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Async variant of get_tool_results using Motor"""
+        if not self.is_connected():
+            return []
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_tool_results, tool_name, target, limit, fields)
+        
+        await self._flush_async()
+        
+        try:
+            query = {}
+            if tool_name:
+                query["tool_name"] = tool_name
+            if target:
+                query["target"] = target
+            
+            pipeline = self._find_pipeline(query, "executed_at", limit, fields)
+            cursor = self.async_db.tool_results.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT))
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"❌ Error retrieving tool results: {e}")
+            return []
+    
+    async def get_agent_actions_async(self, agent_role: Optional[str] = None, pentest_session_id: Optional[str] = None, limit: int = 50,
+                                      fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Async variant of get_agent_actions using Motor"""
+        if not self.is_connected():
+            return []
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_agent_actions, agent_role, pentest_session_id, limit, fields)
+        
+        await self._flush_async()
+        
+        try:
+            query = {}
+            if agent_role:
+                query["agent_role"] = agent_role
+            if pentest_session_id:
+                query["pentest_session_id"] = pentest_session_id
+            
+            pipeline = self._find_pipeline(query, "timestamp", limit, fields)
+            cursor = self.async_db.agent_actions.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT))
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"❌ Error retrieving agent actions: {e}")
+            return []
+    
+    async def get_command_executions_async(self, limit: int = 50, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Async variant of get_command_executions using Motor"""
+        if not self.is_connected():
+            return []
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_command_executions, limit, fields)
+        
+        await self._flush_async()
+        
+        try:
+            pipeline = self._find_pipeline({}, "executed_at", limit, fields)
+            cursor = self.async_db.command_executions.aggregate(pipeline, batchSize=min(limit, FIND_BATCH_LIMIT))
+            return await cursor.to_list(length=limit)
+        except Exception as e:
+            print(f"❌ Error retrieving command executions: {e}")
+            return []
+    
+    async def get_stats_async(self) -> Dict[str, Any]:
+        """Async variant of get_stats using Motor"""
+        if not self.is_connected():
+            return {"error": "Not connected to MongoDB"}
+        if self._stats_cache is not None and time.monotonic() < self._stats_cache_expires:
+            return self._stats_cache
+        if not MOTOR_AVAILABLE:
+            return await asyncio.to_thread(self.get_stats)
+        
+        await self._flush_async()
+        
+        try:
+            from pymongo.errors import OperationFailure
+            
+            counts = {}
+            for collection_name in STATS_COLLECTIONS:
+                try:
+                    counts[collection_name] = await self.async_db[collection_name].estimated_document_count()
+                except OperationFailure:
+                    counts[collection_name] = 0
+            
+            return self._cache_stats(counts)
             
         except Exception as e:
             return {"error": f"Error getting stats: {e}"}
     
     def close_connection(self):
-        """Close MongoDB connection"""
+        """Flush buffered writes and close MongoDB connection"""
         if self.client:
+            if self.connected:
+                self.flush()
+            self._writer.shutdown(wait=True)
             self.client.close()
             self.connected = False
             print("🔌 MongoDB connection closed")
+        if self._async_client:
+            self._async_client.close()
+            self._async_client = None
+            self._async_db = None
+
+@functools.lru_cache(maxsize=1)
+def _get_mongo() -> CrewAIMongoDB:
+    """Process-wide CrewAIMongoDB; its MongoClient is thread-safe and pools connections, so share it"""
+    mongo = CrewAIMongoDB()
+    atexit.register(mongo.close_connection)
+    return mongo
 
 # Utility function for easy pentest result storage
 def store_pentest_result_to_mongodb(result_data: Dict[str, Any]) -> Optional[str]:
@@ -406,7 +912,7 @@ def store_pentest_result_to_mongodb(result_data: Dict[str, Any]) -> Optional[str
     Returns:
         ObjectId string if successful, None if failed
     """
-    mongo = CrewAIMongoDB()
+    mongo = _get_mongo()
     if mongo.is_connected():
         return mongo.store_pentest_result(result_data)
     return None
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Webhook push notifications for long-running pentest sessions
+
+Clients that register a push notification config receive a
+TaskStatusUpdateEvent-style POST when their session finishes, instead of
+polling /session/{id}/status.
+"""
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+from datetime import datetime
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+PUSH_TIMEOUT = 5.0
+
+# Optional comma-separated allowlist; when set, webhooks only go to these hosts
+PUSH_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.getenv("PUSH_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    return ip.is_global and not ip.is_multicast
+
+def check_webhook_url(url: str, resolve: bool = True) -> str:
+    """
+    Reject webhook URLs that could reach internal services (SSRF)
+    
+    Args:
+        url: Caller-supplied webhook URL
+        resolve: Also resolve the host and check every address it maps to
+        
+    Returns:
+        The URL, if it is http(s) and its host is allowlisted or public
+        
+    Raises:
+        ValueError: For other schemes, or private, loopback or link-local hosts
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise ValueError("Webhook URL must be an http(s) URL with a host")
+    
+    if PUSH_ALLOWED_HOSTS:
+        if host not in PUSH_ALLOWED_HOSTS:
+            raise ValueError(f"Webhook host {host} is not in PUSH_ALLOWED_HOSTS")
+        return url
+    
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValueError("Webhook host must not be loopback")
+    try:
+        ipaddress.ip_address(host)
+        addresses = [host]
+    except ValueError:
+        addresses = []
+    if resolve and not addresses:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        try:
+            addresses = [info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)]
+        except socket.gaierror as e:
+            raise ValueError(f"Webhook host {host} does not resolve: {e}")
+    if not all(_is_public_address(address) for address in addresses):
+        raise ValueError(f"Webhook host {host} is a private, loopback or link-local address")
+    return url
+
+def status_event(session_id: str, state: str, **metadata: Any) -> Dict[str, Any]:
+    """
+    Build a status update event for a session
+
+    Args:
+        session_id: Session the event belongs to
+        state: New session status (completed, error, ...)
+        **metadata: Extra fields such as target or error
+
+    Returns:
+        JSON-serializable event payload
+    """
+    return {
+        "id": session_id,
+        "status": {
+            "state": state,
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        "final": state in ("completed", "error"),
+        "metadata": metadata
+    }
+
+def _headers(config: Dict[str, Any]) -> Dict[str, str]:
+    token: Optional[str] = config.get("token")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+async def send_push_notification_async(client: httpx.AsyncClient, config: Dict[str, Any], event: Dict[str, Any]):
+    """POST an event to the client's webhook using a shared async client; failures are logged, not raised"""
+    try:
+        # Re-checked at send time: the host may resolve differently than when the request was validated
+        await asyncio.to_thread(check_webhook_url, config["url"])
+        response = await client.post(config["url"], json=event, headers=_headers(config), timeout=PUSH_TIMEOUT)
+        response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"⚠️ Push notification to {config.get('url')} failed: {e}")
+
+def send_push_notification(config: Dict[str, Any], event: Dict[str, Any]):
+    """Blocking variant of send_push_notification_async for task queue workers"""
+    try:
+        check_webhook_url(config["url"])
+        response = httpx.post(config["url"], json=event, headers=_headers(config), timeout=PUSH_TIMEOUT)
+        response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"⚠️ Push notification to {config.get('url')} failed: {e}")
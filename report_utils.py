@@ -0,0 +1,61 @@
+"""
+Pure report/summary helpers
+
+Kept free of CrewAI/MongoDB imports so they can run in ProcessPoolExecutor
+workers, which import this module on their own.
+"""
+
+from typing import Dict, Any
+
+VULNERABILITY_KEYWORDS = ("vulnerability", "exploit", "weak", "missing", "exposed")
+
+def summarize_pentest_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate a summary of the penetration testing results
+
+    Args:
+        results: Pentest results with a "phases" mapping
+
+    Returns:
+        Summary with tool, finding and vulnerability counts plus recommendations
+    """
+    summary = {
+        "total_phases": len(results.get("phases", {})),
+        "total_tools_used": [],
+        "total_findings": 0,
+        "vulnerabilities_found": 0,
+        "success_rate": 0,
+        "recommendations": []
+    }
+
+    successful_tasks = 0
+    total_tasks = 0
+
+    for phase_name, phase_data in results.get("phases", {}).items():
+        if isinstance(phase_data, dict):
+            summary["total_tools_used"].extend(phase_data.get("tools_used", []))
+            summary["total_findings"] += len(phase_data.get("findings", []))
+
+            for task in phase_data.get("tasks", []):
+                total_tasks += 1
+                if task.get("success"):
+                    successful_tasks += 1
+
+                # Count potential vulnerabilities
+                output = task.get("output", "").lower()
+                if any(keyword in output for keyword in VULNERABILITY_KEYWORDS):
+                    summary["vulnerabilities_found"] += 1
+
+    # Remove duplicates and calculate success rate
+    summary["total_tools_used"] = list(set(summary["total_tools_used"]))
+    summary["success_rate"] = (successful_tasks / max(total_tasks, 1)) * 100
+
+    # Generate recommendations based on findings
+    if summary["vulnerabilities_found"] > 0:
+        summary["recommendations"].append("High priority: Address identified vulnerabilities immediately")
+    if summary["total_findings"] < 5:
+        summary["recommendations"].append("Medium priority: Consider more comprehensive testing")
+
+    summary["recommendations"].append("Monitor and re-test after remediation")
+
+    return summary
@@ -4,7 +4,8 @@ Startup script for the PenTest AI API
 """
 
 import asyncio
-import subprocess
+import importlib.util
+import re
 import sys
 import os
 import logging
@@ -17,23 +18,37 @@ sys.path.insert(0, str(project_root))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+REQUIRED_MODULES = ("fastapi", "uvicorn", "crewai", "ollama")
+
+def _requirement_specs(names):
+    """Pinned requirements.txt lines for the given packages, falling back to the bare name"""
+    pinned = {}
+    requirements = project_root / "requirements.txt"
+    if requirements.exists():
+        for line in requirements.read_text().splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                pinned[re.split(r"[\[=<>~!;\s]", line, 1)[0].lower()] = line
+    return [pinned.get(name, name) for name in names]
+
 async def check_dependencies():
-    """Check if required dependencies are installed"""
-    try:
-        import fastapi
-        import uvicorn
-        import crewai
-        import ollama
+    """Check if required dependencies are installed, installing only the missing ones"""
+    # find_spec locates the packages without importing them
+    missing = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+    if not missing:
         logger.info("All Python dependencies are available")
         return True
-    except ImportError as e:
-        logger.error(f"Missing dependency: {e}")
-        logger.info("Installing dependencies...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-        return True
+    
+    logger.error(f"Missing dependencies: {', '.join(missing)}")
+    logger.info("Installing missing dependencies...")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "pip", "install", *_requirement_specs(missing)
+    )
+    return await process.wait() == 0
 
 async def setup_ollama():
     """Setup Ollama and download the Deepseek model"""
+    ollama_manager = None
     try:
         from models.ollama_manager import OllamaManager
         
@@ -45,6 +60,9 @@ async def setup_ollama():
     except Exception as e:
         logger.error(f"Failed to setup Ollama: {e}")
         return False
+    finally:
+        if ollama_manager is not None:
+            await ollama_manager.aclose()
 
 async def start_api():
     """Start the FastAPI application"""
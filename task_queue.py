@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Background Task Queue for Long-Running Penetration Tests
+
+Runs pentest workflows on Celery workers with a Redis broker so HTTP requests
+return immediately with a task ID instead of holding a connection open.
+Task status and results are kept in a Redis hash ``task:{id}``.
+
+Comprehensive pentests started from main_crewai run here too; their progress
+is written straight into that app's ``session:{id}`` records.
+
+Enabled only when Celery/redis are installed and REDIS_URL is set.
+Start a worker with: celery -A task_queue.celery_app worker --concurrency N
+(N bounds how many pentests run at once, independently of web workers)
+"""
+
+import os
+import json
+import uuid
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from push_notifications import status_event, send_push_notification
+
+logger = logging.getLogger(__name__)
+
+try:
+    from celery import Celery
+    from celery.signals import worker_process_shutdown
+    import redis
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+REDIS_URL = os.getenv("REDIS_URL")
+TASK_RESULT_TTL = int(os.getenv("TASK_RESULT_TTL", "86400"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))
+
+celery_app = None
+_redis = None
+
+if CELERY_AVAILABLE and REDIS_URL:
+    celery_app = Celery("pentest", broker=REDIS_URL)
+    # Ack after completion so a crashed worker's pentest is redelivered, and
+    # don't let one worker hoard queued pentests
+    celery_app.conf.update(task_acks_late=True, worker_prefetch_multiplier=1)
+    _redis = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+def is_enabled() -> bool:
+    """Check if the background task queue is configured"""
+    return celery_app is not None
+
+def _set_status(task_id: str, **fields: Any):
+    """Merge fields into the task's Redis hash"""
+    key = f"task:{task_id}"
+    _redis.hset(key, mapping={k: json.dumps(v, default=str) for k, v in fields.items()})
+    _redis.expire(key, TASK_RESULT_TTL)
+
+def _update_session(session_id: str, **fields: Any):
+    """Merge fields into a main_crewai session record"""
+    key = f"session:{session_id}"
+    raw = _redis.get(key)
+    data = json.loads(raw) if raw else {}
+    data.update(fields)
+    _redis.set(key, json.dumps(data, default=str), ex=SESSION_TTL)
+
+def _publish_progress(session_id: str, event: str, data: Dict[str, Any]):
+    """Publish a progress event to main_crewai's /session/{id}/stream subscribers"""
+    _redis.publish(f"session:{session_id}:progress", json.dumps({"event": event, "data": data}, default=str))
+
+def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the status and results of a queued task
+
+    Args:
+        task_id: ID returned by enqueue_pentest
+
+    Returns:
+        Task status dictionary, or None if the task is unknown
+    """
+    if not is_enabled():
+        return None
+
+    data = _redis.hgetall(f"task:{task_id}")
+    if not data:
+        return None
+    return {k: json.loads(v) for k, v in data.items()}
+
+if celery_app is not None:
+    # Per worker thread (one per prefork child): the crew's async clients (Ollama,
+    # httpx, Motor) bind to the loop they first run on, so every task reuses that loop
+    # instead of a fresh asyncio.run() loop
+    _worker_state = threading.local()
+
+    def _get_worker_crew():
+        """Build the worker's PentestCrew on first use"""
+        if getattr(_worker_state, "crew", None) is None:
+            from agents.pentest_crew import PentestCrew
+            _worker_state.crew = PentestCrew()
+        return _worker_state.crew
+
+    def _run_on_worker_loop(coro):
+        """Run a coroutine to completion on the worker's long-lived event loop"""
+        loop = getattr(_worker_state, "loop", None)
+        if loop is None or loop.is_closed():
+            loop = _worker_state.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+
+    @worker_process_shutdown.connect
+    def _close_worker_crew(**kwargs):
+        """Close the worker crew's Ollama connections and its loop when the child exits"""
+        crew = getattr(_worker_state, "crew", None)
+        if crew is not None:
+            try:
+                _run_on_worker_loop(crew.aclose())
+            except Exception as e:
+                logger.warning(f"Failed to close worker crew: {e}")
+            _worker_state.crew = None
+        loop = getattr(_worker_state, "loop", None)
+        if loop is not None and not loop.is_closed():
+            loop.close()
+
+    @celery_app.task(bind=True, max_retries=2)
+    def run_pentest_task(self, target: str, scope: str, params: Dict[str, Any]) -> str:
+        """Execute a full pentest workflow on a worker"""
+        task_id = self.request.id
+        _set_status(task_id, status="running", started_at=datetime.utcnow().isoformat())
+
+        try:
+            results = _run_on_worker_loop(_get_worker_crew().execute_pentest(
+                target=target,
+                scope=scope,
+                additional_params=params
+            ))
+            _set_status(task_id, status="completed", results=results,
+                        completed_at=datetime.utcnow().isoformat())
+            return "completed"
+        except Exception as e:
+            if self.request.retries < self.max_retries:
+                _set_status(task_id, status="retrying", error=str(e))
+                raise self.retry(exc=e, countdown=10)
+            _set_status(task_id, status="failed", error=str(e),
+                        completed_at=datetime.utcnow().isoformat())
+            raise
+
+    @celery_app.task
+    def run_comprehensive_pentest_task(session_id: str, target: str, scope: str, max_duration: int,
+                                       push_config: Optional[Dict[str, Any]] = None) -> str:
+        """Execute a main_crewai comprehensive pentest and record it in the session"""
+        _update_session(session_id, status="running_comprehensive")
+        _publish_progress(session_id, "status", status_event(session_id, "running_comprehensive", target=target))
+
+        try:
+            results = _run_on_worker_loop(_get_worker_crew().execute_pentest(
+                target=target,
+                scope=scope,
+                additional_params={"max_duration_minutes": max_duration, "session_id": session_id},
+                on_progress=lambda event: _publish_progress(session_id, "progress", event)
+            ))
+            _update_session(session_id, status="completed", results=results,
+                            completed_at=datetime.utcnow().isoformat())
+            _publish_progress(session_id, "status", status_event(session_id, "completed", target=target))
+            logger.info(f"Comprehensive AI-guided pentest completed for session {session_id}")
+            if push_config:
+                send_push_notification(push_config, status_event(session_id, "completed", target=target))
+            return "completed"
+        except Exception as e:
+            logger.error(f"Error in comprehensive pentest {session_id}: {e}")
+            _update_session(session_id, status="error", error=str(e))
+            _publish_progress(session_id, "status", status_event(session_id, "error", target=target, error=str(e)))
+            if push_config:
+                send_push_notification(push_config, status_event(session_id, "error", target=target, error=str(e)))
+            raise
+
+def enqueue_pentest(target: str, scope: str, params: Dict[str, Any]) -> str:
+    """
+    Queue a pentest workflow for background execution
+
+    Args:
+        target: Target to test
+        scope: Testing scope
+        params: Additional parameters passed to execute_pentest
+
+    Returns:
+        Task ID for polling /tasks/{task_id}
+    """
+    if not is_enabled():
+        raise RuntimeError("Task queue not configured - set REDIS_URL and install celery/redis")
+
+    task_id = str(uuid.uuid4())
+    _set_status(task_id, status="queued", target=target, scope=scope,
+                queued_at=datetime.utcnow().isoformat())
+    run_pentest_task.apply_async(args=[target, scope, params], task_id=task_id)
+    logger.info(f"Queued pentest task {task_id} for target: {target}")
+    return task_id
+
+def enqueue_comprehensive_pentest(session_id: str, target: str, scope: str, max_duration: int,
+                                  push_config: Optional[Dict[str, Any]] = None):
+    """
+    Queue a main_crewai comprehensive pentest for a worker
+
+    Args:
+        session_id: Session whose record the worker updates
+        target: Target to test
+        scope: Testing scope
+        max_duration: Time budget in minutes
+        push_config: Optional webhook {url, token} notified when the session finishes
+    """
+    if not is_enabled():
+        raise RuntimeError("Task queue not configured - set REDIS_URL and install celery/redis")
+
+    run_comprehensive_pentest_task.apply_async(
+        args=[session_id, target, scope, max_duration, push_config], task_id=session_id
+    )
+    logger.info(f"Queued comprehensive pentest for session {session_id}")
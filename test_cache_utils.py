@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared TimedLRUCache
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from cache_utils import TimedLRUCache
+
+def test_hit_after_miss():
+    """A second lookup for the same key is served from cache"""
+    cache = TimedLRUCache(ttl=60)
+    calls = []
+    
+    value, hit = cache.get_or_compute("key", lambda: calls.append(1) or "value")
+    assert (value, hit) == ("value", False)
+    
+    value, hit = cache.get_or_compute("key", lambda: calls.append(1) or "other")
+    assert (value, hit) == ("value", True)
+    assert len(calls) == 1
+
+def test_entries_expire_after_ttl():
+    """Entries older than the TTL are recomputed"""
+    cache = TimedLRUCache(ttl=0.05)
+    cache.get_or_compute("key", lambda: "old")
+    time.sleep(0.1)
+    
+    value, hit = cache.get_or_compute("key", lambda: "new")
+    assert (value, hit) == ("new", False)
+
+def test_least_recently_used_entry_is_evicted():
+    """Going over maxsize drops the least recently used key"""
+    cache = TimedLRUCache(ttl=60, maxsize=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    # Touch "a" so "b" becomes the eviction candidate
+    cache.get_or_compute("a", lambda: 0)
+    cache.get_or_compute("c", lambda: 3)
+    
+    assert cache.get_or_compute("a", lambda: 0) == (1, True)
+    assert cache.get_or_compute("c", lambda: 0) == (3, True)
+    assert cache.get_or_compute("b", lambda: 20) == (20, False)
+
+def test_clear_returns_removed_count():
+    """clear() empties the cache and reports how many entries it dropped"""
+    cache = TimedLRUCache(ttl=60)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    
+    assert cache.clear() == 2
+    assert cache.get_or_compute("a", lambda: 10) == (10, False)
+
+def test_concurrent_async_misses_compute_once():
+    """Concurrent misses for one key share a single compute call"""
+    cache = TimedLRUCache(ttl=60)
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+    
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute_async("key", compute) for _ in range(5)])
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["value"] * 5
+    assert sum(1 for _, hit in results if not hit) == 1
+    assert not cache._key_locks
+
+def test_async_misses_for_different_keys_run_concurrently():
+    """Single-flight is per key; other keys are not blocked"""
+    cache = TimedLRUCache(ttl=60)
+    
+    async def compute():
+        await asyncio.sleep(0.1)
+        return "value"
+    
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[cache.get_or_compute_async(key, compute) for key in range(5)])
+        return time.monotonic() - start
+    
+    assert asyncio.run(run()) < 0.3
+
+if __name__ == "__main__":
+    tests = [value for name, value in dict(globals()).items() if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
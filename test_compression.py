@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for StreamAwareGZipMiddleware
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import StreamAwareGZipMiddleware
+
+BODY = "x" * 2000
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(StreamAwareGZipMiddleware, minimum_size=500)
+    
+    @app.get("/plain")
+    async def plain():
+        return PlainTextResponse(BODY)
+    
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for _ in range(4):
+                yield "data: " + "x" * 500 + "\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+    
+    @app.get("/ndjson")
+    async def ndjson():
+        async def stream():
+            for _ in range(4):
+                yield '{"line": "' + "x" * 500 + '"}\n'
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+    
+    return app
+
+client = TestClient(_create_app())
+
+def test_regular_responses_are_compressed():
+    """Large non-streaming responses are still gzipped"""
+    response = client.get("/plain", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+def test_event_streams_are_not_compressed():
+    """SSE responses pass through uncompressed"""
+    response = client.get("/events", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text.count("data: ") == 4
+
+def test_ndjson_streams_are_not_compressed():
+    """NDJSON responses pass through uncompressed"""
+    response = client.get("/ndjson", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert len(response.text.splitlines()) == 4
+
+def test_no_compression_without_accept_encoding():
+    """Clients that don't accept gzip get the raw body"""
+    response = client.get("/plain", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+if __name__ == "__main__":
+    tests = [value for name, value in dict(globals()).items() if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
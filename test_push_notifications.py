@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for webhook URL validation in push_notifications
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+import push_notifications
+from push_notifications import check_webhook_url
+
+def _rejected(url: str) -> bool:
+    try:
+        check_webhook_url(url, resolve=False)
+    except ValueError:
+        return True
+    return False
+
+def test_public_urls_are_accepted():
+    """Public hosts and addresses pass through unchanged"""
+    assert check_webhook_url("https://hooks.example.com/cb", resolve=False) == "https://hooks.example.com/cb"
+    assert check_webhook_url("http://93.184.216.34:8080/cb", resolve=False) == "http://93.184.216.34:8080/cb"
+
+def test_internal_addresses_are_rejected():
+    """Loopback, private, link-local and metadata addresses are refused"""
+    for url in [
+        "http://127.0.0.1/cb",
+        "http://10.0.0.5/cb",
+        "http://192.168.1.1/cb",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/cb",
+        "http://localhost:8000/cb",
+        "http://api.localhost/cb",
+    ]:
+        assert _rejected(url), url
+
+def test_non_http_schemes_are_rejected():
+    """Only http(s) URLs with a host are accepted"""
+    assert _rejected("ftp://hooks.example.com/cb")
+    assert _rejected("file:///etc/passwd")
+
+def test_allowlist_overrides_address_checks():
+    """With PUSH_ALLOWED_HOSTS set only listed hosts are accepted"""
+    original = push_notifications.PUSH_ALLOWED_HOSTS
+    push_notifications.PUSH_ALLOWED_HOSTS = frozenset({"hooks.internal"})
+    try:
+        assert check_webhook_url("http://hooks.internal/cb") == "http://hooks.internal/cb"
+        assert _rejected("https://hooks.example.com/cb")
+    finally:
+        push_notifications.PUSH_ALLOWED_HOSTS = original
+
+if __name__ == "__main__":
+    tests = [value for name, value in dict(globals()).items() if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
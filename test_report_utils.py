@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for summarize_pentest_results
+
+The summary moved out of PentestCrew.generate_pentest_summary so it can run in
+process pool workers; these fixtures pin the output the crew method produced.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from report_utils import summarize_pentest_results
+
+RESULTS = {
+    "target": "example.com",
+    "phases": {
+        "reconnaissance": {
+            "tools_used": ["nmap", "whois"],
+            "findings": ["port 22 open", "port 80 open"],
+            "tasks": [
+                {"success": True, "output": "Open ports found"},
+                {"success": True, "output": "Registrar details"},
+            ],
+        },
+        "vulnerability_assessment": {
+            "tools_used": ["nikto", "nmap"],
+            "findings": ["outdated server"],
+            "tasks": [
+                {"success": True, "output": "X-Frame-Options header MISSING"},
+                {"success": False, "output": "Weak cipher suites exposed"},
+                {"success": False},
+            ],
+        },
+        # Non-dict phases are counted but otherwise ignored
+        "exploitation": "skipped",
+    },
+}
+
+def test_summary_matches_crew_output():
+    """Counts, success rate and recommendations match the original crew method"""
+    summary = summarize_pentest_results(RESULTS)
+    
+    assert sorted(summary.pop("total_tools_used")) == ["nikto", "nmap", "whois"]
+    assert summary == {
+        "total_phases": 3,
+        "total_findings": 3,
+        "vulnerabilities_found": 2,
+        "success_rate": 60.0,
+        "recommendations": [
+            "High priority: Address identified vulnerabilities immediately",
+            "Medium priority: Consider more comprehensive testing",
+            "Monitor and re-test after remediation",
+        ],
+    }
+
+def test_summary_of_empty_results():
+    """Results without phases still produce a well-formed summary"""
+    assert summarize_pentest_results({}) == {
+        "total_phases": 0,
+        "total_tools_used": [],
+        "total_findings": 0,
+        "vulnerabilities_found": 0,
+        "success_rate": 0.0,
+        "recommendations": [
+            "Medium priority: Consider more comprehensive testing",
+            "Monitor and re-test after remediation",
+        ],
+    }
+
+def test_thorough_clean_run_only_recommends_retest():
+    """Five or more findings and no vulnerable output drop the extra recommendations"""
+    results = {
+        "phases": {
+            "reconnaissance": {
+                "tools_used": ["nmap"],
+                "findings": ["a", "b", "c", "d", "e"],
+                "tasks": [{"success": True, "output": "all clear"}],
+            }
+        }
+    }
+    summary = summarize_pentest_results(results)
+    
+    assert summary["success_rate"] == 100.0
+    assert summary["recommendations"] == ["Monitor and re-test after remediation"]
+
+if __name__ == "__main__":
+    tests = [value for name, value in dict(globals()).items() if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -75,16 +75,16 @@ async def main():
     """Run all tests"""
     print("🚀 Starting PenTest AI API Tests\n")
     
+    # The tests touch independent subsystems; the Ollama probes go first so their
+    # network waits overlap the import-heavy API and crew checks
     tests = [
-        test_api_imports,
         test_ollama_manager,
+        test_api_imports,
         test_pentest_crew,
     ]
     
-    results = []
-    for test in tests:
-        result = await test()
-        results.append(result)
+    outcomes = await asyncio.gather(*[test() for test in tests], return_exceptions=True)
+    results = [outcome is True for outcome in outcomes]
     
     print(f"\n📊 Test Results:")
     print(f"Passed: {sum(results)}/{len(results)}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-encoded /agents and /ai-agents/available payloads
+"""
+
+import sys
+from pathlib import Path
+from typing import List
+
+# Add project root to path
+project_root = Path(__file__).parent.absolute()
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from main import AgentInfo
+
+# The lifespan (Ollama warmup, Azure logging) is not needed for static payloads
+client = TestClient(main.app)
+
+def _legacy_client() -> TestClient:
+    """The endpoints as they were before pre-encoding: built per request and validated through response_model"""
+    legacy = FastAPI()
+    
+    @legacy.get("/agents", response_model=List[AgentInfo])
+    async def get_available_agents():
+        return [
+            AgentInfo(
+                name="recon",
+                role="Reconnaissance Specialist", 
+                description="Performs comprehensive reconnaissance using nmap, enum4linux, and nikto"
+            ),
+            AgentInfo(
+                name="vulnerability",
+                role="Vulnerability Assessment Expert",
+                description="Identifies vulnerabilities using sqlmap, OWASP ZAP, Burp Suite, and nikto"
+            ),
+            AgentInfo(
+                name="exploitation", 
+                role="Exploitation Specialist",
+                description="Performs controlled exploitation using Metasploit, Hydra, and John the Ripper"
+            ),
+            AgentInfo(
+                name="reporting",
+                role="Security Report Analyst", 
+                description="Generates comprehensive security reports from tool outputs"
+            )
+        ]
+    
+    @legacy.get("/ai-agents/available")
+    async def get_available_ai_agents():
+        return {
+            "agents": [
+                {
+                    "role": "Reconnaissance Specialist",
+                    "description": "Gathers comprehensive information about target systems using tools like nmap, enum4linux, and nikto",
+                    "capabilities": ["network_scanning", "service_identification", "information_gathering"],
+                    "primary_tools": ["nmap", "nikto", "enum4linux"]
+                },
+                {
+                    "role": "Vulnerability Assessment Expert", 
+                    "description": "Identifies and analyzes security vulnerabilities using specialized tools",
+                    "capabilities": ["vulnerability_scanning", "web_app_testing", "risk_assessment"],
+                    "primary_tools": ["sqlmap", "zap", "burp", "nikto"]
+                },
+                {
+                    "role": "Exploitation Specialist",
+                    "description": "Safely demonstrates and validates identified vulnerabilities",
+                    "capabilities": ["exploitation", "privilege_escalation", "proof_of_concept"],
+                    "primary_tools": ["metasploit", "hydra", "john"]
+                },
+                {
+                    "role": "Security Report Analyst",
+                    "description": "Generates comprehensive and actionable security reports",
+                    "capabilities": ["report_generation", "risk_analysis", "recommendations"],
+                    "primary_tools": ["analysis", "reporting", "documentation"]
+                }
+            ],
+            "ai_guidance_enabled": True,
+            "model_backend": "ollama_deepseek"
+        }
+    
+    return TestClient(legacy)
+
+legacy_client = _legacy_client()
+
+def test_agents_match_response_model_output():
+    """/agents returns the same JSON the response_model endpoint produced"""
+    response = client.get("/agents")
+    legacy = legacy_client.get("/agents")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == legacy.json()
+
+def test_ai_agents_match_previous_output():
+    """/ai-agents/available returns the same JSON as the dict it replaced"""
+    response = client.get("/ai-agents/available")
+    
+    assert response.status_code == 200
+    assert response.json() == legacy_client.get("/ai-agents/available").json()
+
+def test_agents_etag_revalidation():
+    """A matching If-None-Match gets an empty 304; a stale one gets the full body"""
+    response = client.get("/agents")
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    
+    cached = client.get("/agents", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+    
+    stale = client.get("/agents", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == response.content
+
+def test_ai_agents_etag_revalidation():
+    """/ai-agents/available answers its own ETag with 304"""
+    etag = client.get("/ai-agents/available").headers["etag"]
+    
+    assert client.get("/ai-agents/available", headers={"If-None-Match": etag}).status_code == 304
+    assert etag != client.get("/agents").headers["etag"]
+
+if __name__ == "__main__":
+    tests = [value for name, value in dict(globals()).items() if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
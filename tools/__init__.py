@@ -5,22 +5,42 @@ This package contains specialized tools for penetration testing operations.
 Each tool provides a safe interface to common security testing utilities.
 """
 
+import importlib
+import shutil
+import threading
+from typing import Any, Dict, List
+
 from .base_tool import BasePenTestTool, ToolResult
-from .nmap_tool import NmapTool
-from .metasploit_tool import MetasploitTool
-from .burp_tool import BurpTool
-from .zap_tool import ZAPTool
-from .sqlmap_tool import SqlmapTool
-from .nikto_tool import NiktoTool
-from .hydra_tool import HydraTool
-from .enum4linux_tool import Enum4linuxTool
-from .john_tool import JohnTool
-from .wireshark_tool import WiresharkTool
-# New advanced tools
-from .theharvester_tool import TheHarvesterTool
-from .nuclei_tool import NucleiTool
-from .masscan_tool import MasscanTool
-from .dirsearch_tool import DirsearchTool
+
+# Tool classes are imported on first access (PEP 562), so importing the package
+# doesn't load every tool module and its dependencies
+_LAZY = {
+    'NmapTool': '.nmap_tool',
+    'MetasploitTool': '.metasploit_tool',
+    'BurpTool': '.burp_tool',
+    'ZAPTool': '.zap_tool',
+    'SqlmapTool': '.sqlmap_tool',
+    'NiktoTool': '.nikto_tool',
+    'HydraTool': '.hydra_tool',
+    'Enum4linuxTool': '.enum4linux_tool',
+    'JohnTool': '.john_tool',
+    'WiresharkTool': '.wireshark_tool',
+    # New advanced tools
+    'TheHarvesterTool': '.theharvester_tool',
+    'NucleiTool': '.nuclei_tool',
+    'MasscanTool': '.masscan_tool',
+    'DirsearchTool': '.dirsearch_tool'
+}
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY))
 
 __all__ = [
     'BasePenTestTool',
@@ -45,53 +65,78 @@ __all__ = [
 class ToolManager:
     """Manager for all penetration testing tools"""
     
+    # Executable each tool wraps, for availability checks that don't construct the tool
+    BINARIES = {
+        'nmap': 'nmap',
+        'masscan': 'masscan',
+        'burp': 'burpsuite',
+        'zap': 'zap.sh',
+        'sqlmap': 'sqlmap',
+        'nikto': 'nikto',
+        'dirsearch': 'dirsearch',
+        'nuclei': 'nuclei',
+        'hydra': 'hydra',
+        'john': 'john',
+        'theharvester': 'theHarvester',
+        'enum4linux': 'enum4linux',
+        'wireshark': 'tshark',
+        'metasploit': 'msfconsole'
+    }
+    
     def __init__(self):
-        self.tools = {
+        # Class names from _LAZY; each tool is imported and built on first use (some open sessions or a MongoDB connection)
+        self._factories = {
             # Core scanning tools
-            'nmap': NmapTool(),
-            'masscan': MasscanTool(),
+            'nmap': 'NmapTool',
+            'masscan': 'MasscanTool',
             
             # Web application testing
-            'burp': BurpTool(),
-            'zap': ZAPTool(),
-            'sqlmap': SqlmapTool(),
-            'nikto': NiktoTool(),
-            'dirsearch': DirsearchTool(),
-            'nuclei': NucleiTool(),
+            'burp': 'BurpTool',
+            'zap': 'ZAPTool',
+            'sqlmap': 'SqlmapTool',
+            'nikto': 'NiktoTool',
+            'dirsearch': 'DirsearchTool',
+            'nuclei': 'NucleiTool',
             
             # Authentication & brute force
-            'hydra': HydraTool(),
-            'john': JohnTool(),
+            'hydra': 'HydraTool',
+            'john': 'JohnTool',
             
             # Information gathering
-            'theharvester': TheHarvesterTool(),
-            'enum4linux': Enum4linuxTool(),
+            'theharvester': 'TheHarvesterTool',
+            'enum4linux': 'Enum4linuxTool',
             
             # Network analysis
-            'wireshark': WiresharkTool(),
+            'wireshark': 'WiresharkTool',
             
             # Exploitation frameworks
-            'metasploit': MetasploitTool()
+            'metasploit': 'MetasploitTool'
         }
+        self._tools: Dict[str, BasePenTestTool] = {}
+        self._lock = threading.Lock()
     
     def get_tool(self, tool_name: str) -> BasePenTestTool:
-        """Get a specific tool by name"""
-        if tool_name not in self.tools:
-            raise ValueError(f"Tool '{tool_name}' not found. Available tools: {list(self.tools.keys())}")
-        return self.tools[tool_name]
+        """Get a specific tool by name, constructing it on first use"""
+        if tool_name not in self._factories:
+            raise ValueError(f"Tool '{tool_name}' not found. Available tools: {list(self._factories.keys())}")
+        tool = self._tools.get(tool_name)
+        if tool is None:
+            with self._lock:
+                tool = self._tools.get(tool_name)
+                if tool is None:
+                    tool = self._tools[tool_name] = __getattr__(self._factories[tool_name])()
+        return tool
     
     def get_available_tools(self) -> list:
         """Get list of available tool names"""
-        return list(self.tools.keys())
+        return list(self._factories.keys())
     
     def check_tool_availability(self) -> dict:
         """Check which tools are actually installed and available"""
         availability = {}
-        for name, tool in self.tools.items():
-            # This would check if the actual tool is installed
-            # For now, we'll assume they use fallback methods
+        for name in self._factories:
             availability[name] = {
                 'available': True,  # All tools have fallback implementations
-                'tool': tool
+                'installed': shutil.which(self.BINARIES[name]) is not None
             }
         return availability